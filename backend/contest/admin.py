@@ -1,5 +1,7 @@
-from django.contrib import admin
-from .models import Contestant, EmailVerificationToken, WinnerDraw
+from django.contrib import admin, messages
+from .deliveries import requeue_deliveries
+from .models import Campaign, Contestant, EmailDelivery, EmailVerificationToken, OutboxMessage, WinnerDraw
+from .utils import search_contestants
 
 @admin.register(Contestant)
 class ContestantAdmin(admin.ModelAdmin):
@@ -12,6 +14,12 @@ class ContestantAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     list_per_page = 50
 
+    def get_search_results(self, request, queryset, search_term):
+        # Usa la columna search_text indexada en vez de 4 icontains con OR
+        if not search_term:
+            return queryset, False
+        return search_contestants(queryset, search_term), False
+
     fieldsets = (
         ("Información Personal", {
             "fields": ("first_name", "last_name", "second_last_name", "email", "phone")
@@ -46,12 +54,12 @@ class EmailVerificationTokenAdmin(admin.ModelAdmin):
 
 @admin.register(WinnerDraw)
 class WinnerDrawAdmin(admin.ModelAdmin):
-    list_display = ("contestant", "drawn_at")
-    list_filter = ("drawn_at",)
+    list_display = ("contestant", "campaign", "position", "is_alternate", "drawn_at", "seed")
+    list_filter = ("campaign", "is_alternate", "drawn_at")
     search_fields = ("contestant__email", "contestant__first_name", "contestant__last_name")
     ordering = ("-drawn_at",)
-    readonly_fields = ("drawn_at",)
-    list_select_related = ("contestant",)
+    readonly_fields = ("drawn_at", "seed")
+    list_select_related = ("contestant", "campaign")
     date_hierarchy = "drawn_at"
     list_per_page = 50
 
@@ -59,3 +67,56 @@ class WinnerDrawAdmin(admin.ModelAdmin):
         # Mantén True si quieres poder simular ganadores desde admin.
         # Déjalo en False (como Copilot) si quieres obligar el flujo real vía endpoint.
         return False
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "winners_count", "alternates_count", "created_at")
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at",)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("task_name", "created_at", "published_at", "attempts", "available_at", "failed_at")
+    list_filter = ("task_name", "published_at", "failed_at")
+    ordering = ("-id",)
+    readonly_fields = (
+        "task_name", "args", "kwargs", "created_at", "published_at", "attempts", "last_error",
+        "available_at", "failed_at",
+    )
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("contestant", "kind", "status", "attempts", "updated_at", "sent_at", "short_error")
+    # status + kind + fecha usan el índice delivery_status_kind
+    list_filter = ("status", "kind", "updated_at")
+    search_fields = ("contestant__email",)
+    ordering = ("-updated_at",)
+    readonly_fields = (
+        "kind", "contestant", "reference", "status", "attempts", "last_error",
+        "created_at", "updated_at", "sent_at",
+    )
+    list_select_related = ("contestant",)
+    date_hierarchy = "updated_at"
+    list_per_page = 50
+    actions = ["requeue"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def short_error(self, obj):
+        return obj.last_error[:80]
+    short_error.short_description = "Último error"
+
+    @admin.action(description="Reencolar envíos seleccionados")
+    def requeue(self, request, queryset):
+        count = requeue_deliveries(queryset)
+        self.message_user(request, f"{count} envíos reencolados.", messages.SUCCESS)
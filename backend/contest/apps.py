@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ContestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contest'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .hashing import preload_password_validators
+
+        preload_password_validators()
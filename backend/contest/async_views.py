@@ -0,0 +1,145 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import Throttled, ValidationError
+from rest_framework.request import Request
+
+from . import metrics
+from .hashing import ahash_password
+from .models import EmailVerificationToken
+from .serializers import (
+    ContestantRegistrationSerializer,
+    ContestantSerializer,
+    EmailVerificationSerializer,
+)
+from .throttling import (
+    RegistrationEmailThrottle,
+    RegistrationIPThrottle,
+    VerificationIPThrottle,
+    VerificationTokenThrottle,
+)
+
+
+# Versiones async de los endpoints públicos de más tráfico. DRF no soporta
+# views async, así que son views de Django que reutilizan los serializers
+# (solo para validar), los throttles y las mismas respuestas JSON.
+#
+# El ORM async de Django 5.0 no tiene transacciones: las lecturas usan
+# aget/aexists y cada escritura de varias filas (que debe ser atómica, con su
+# mensaje outbox) se hace en un único salto sync_to_async. El hash de la
+# contraseña corre en el pool de hashing, fuera del hilo de la base.
+
+def _json(data, status_code, headers=None):
+    return JsonResponse(
+        data, status=status_code, headers=headers, safe=False,
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+def _parse_body(request):
+    """Lee el body JSON o de formulario; None si no se puede parsear"""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST.dict()
+
+
+def _check_throttles(request, data, throttle_classes):
+    # Request de DRF con el body ya parseado, para que los throttles lean email/token
+    drf_request = Request(request)
+    drf_request._full_data = data
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(drf_request, None):
+            waits.append(throttle.wait() or 0)
+    if not waits:
+        return None
+    exc = Throttled(max(waits))
+    return _json(
+        {"detail": str(exc.detail)}, status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(math.ceil(exc.wait))},
+    )
+
+
+async def _throttled(request, data, throttle_classes):
+    # Un salto corto a un hilo: el cliente de cache es sync
+    return await sync_to_async(_check_throttles, thread_sensitive=False)(
+        request, data, throttle_classes
+    )
+
+
+class _TokenFormatSerializer(EmailVerificationSerializer):
+    # Valida formato y contraseñas; el token se busca después con aget()
+    def validate_token(self, value):
+        return value
+
+
+@csrf_exempt
+@require_POST
+async def aregister_contestant(request):
+    """Inscripción al concurso (async)"""
+    data = _parse_body(request)
+    if data is None:
+        return _json({"detail": "JSON mal formado."}, status.HTTP_400_BAD_REQUEST)
+    throttled = await _throttled(request, data, [RegistrationIPThrottle, RegistrationEmailThrottle])
+    if throttled is not None:
+        return throttled
+
+    # La validación no consulta la base (sin UniqueValidator en email)
+    serializer = ContestantRegistrationSerializer(data=data)
+    if not serializer.is_valid():
+        return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    try:
+        contestant = await sync_to_async(serializer.save)()
+    except ValidationError as exc:
+        # Email duplicado detectado por el índice único
+        return _json(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    return _json({
+        "message": "¡Gracias por registrarte! Revisa tu correo para verificar tu cuenta.",
+        "contestant_id": contestant.id,
+    }, status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def averify_email_and_set_password(request):
+    """Verificar email y crear contraseña (async)"""
+    data = _parse_body(request)
+    if data is None:
+        return _json({"detail": "JSON mal formado."}, status.HTTP_400_BAD_REQUEST)
+    throttled = await _throttled(request, data, [VerificationIPThrottle, VerificationTokenThrottle])
+    if throttled is not None:
+        return throttled
+
+    serializer = _TokenFormatSerializer(data=data)
+    if not serializer.is_valid():
+        return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        token_obj = await EmailVerificationToken.objects.select_related("contestant").aget(
+            token=serializer.validated_data["token"], used_at__isnull=True
+        )
+    except EmailVerificationToken.DoesNotExist:
+        await metrics.TOKEN_FAILURES.ainc(reason="invalid")
+        return _json({"token": [EmailVerificationSerializer.TOKEN_INVALID_ERROR]}, status.HTTP_400_BAD_REQUEST)
+    if token_obj.is_expired():
+        await metrics.TOKEN_FAILURES.ainc(reason="expired")
+        return _json({"token": [EmailVerificationSerializer.TOKEN_EXPIRED_ERROR]}, status.HTTP_400_BAD_REQUEST)
+
+    encoded_password = await ahash_password(serializer.validated_data["password"])
+    contestant = await sync_to_async(EmailVerificationSerializer.activate)(token_obj, encoded_password)
+
+    return _json({
+        "message": "Tu cuenta ha sido activada. Ya estás participando en el sorteo.",
+        "contestant": ContestantSerializer(contestant).data,
+    }, status.HTTP_200_OK)
@@ -0,0 +1,113 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import OutboxMessage
+
+
+def percentile(sorted_samples, pct):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples, wall_time=None):
+    """
+    Resume una lista de latencias (en segundos).
+
+    Args:
+        samples (list[float]): Latencias individuales
+        wall_time (float): Tiempo total de reloj; si no se entrega se usa la suma
+
+    Returns:
+        dict: count, mean/p50/p95/p99/max en ms y throughput (ops/s)
+    """
+    ordered = sorted(samples)
+    total = sum(ordered)
+    wall_time = wall_time if wall_time is not None else total
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean_ms": (total / count * 1000) if count else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] * 1000) if count else 0.0,
+        "ops_per_sec": (count / wall_time) if wall_time else 0.0,
+    }
+
+
+def time_calls(func, iterations):
+    """
+    Ejecuta func iterations veces y mide cada llamada.
+
+    Returns:
+        dict: Resumen de summarize()
+    """
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+
+
+def time_concurrent(func, items, concurrency=1):
+    """
+    Llama func(item) para cada item, con hasta concurrency hilos, y mide cada llamada.
+
+    Args:
+        func (callable): Devuelve True si la llamada fue exitosa
+        items (Iterable): Argumento de cada llamada
+        concurrency (int): Hilos en paralelo
+
+    Returns:
+        dict: Resumen de summarize() más "errors"
+    """
+    def call(item):
+        t0 = time.perf_counter()
+        ok = func(item)
+        return time.perf_counter() - t0, ok
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        # En el hilo actual (y su conexión a la base)
+        results = [call(item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, items))
+    summary = summarize([elapsed for elapsed, _ in results], time.perf_counter() - start)
+    summary["errors"] = sum(1 for _, ok in results if not ok)
+    return summary
+
+
+def format_summary(name, summary):
+    return (
+        f"{name:<32} n={summary['count']:<7} "
+        f"mean={summary['mean_ms']:.3f}ms p50={summary['p50_ms']:.3f}ms "
+        f"p95={summary['p95_ms']:.3f}ms p99={summary['p99_ms']:.3f}ms "
+        f"{summary['ops_per_sec']:.0f} ops/s"
+    )
+
+
+def own_outbox_ids(task, contestant_ids, after_id):
+    """
+    Ids de los mensajes outbox de task encolados por un benchmark.
+
+    Solo toma los posteriores a after_id cuyo primer argumento es uno de los
+    concursantes que creó el benchmark, para no borrar mensajes reales
+    encolados mientras corre.
+
+    Returns:
+        list[int]: Ids de OutboxMessage
+    """
+    contestant_ids = set(contestant_ids)
+    return [
+        pk for pk, args in (
+            OutboxMessage.objects.filter(id__gt=after_id, task_name=task.name).values_list("id", "args")
+        )
+        if args and args[0] in contestant_ids
+    ]
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+logger = logging.getLogger(__name__)
+
+WINNER_CACHE_KEY = "winner:payload"
+
+
+def redis_client(backend):
+    """Cliente redis-py de un backend de cache, o None si no es Redis (para pipelines)"""
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
+
+
+def _version_key(key):
+    return f"{key}:version"
+
+
+def cached_payload(key, build):
+    """
+    Devuelve un payload cacheado sin expiración (se invalida explícitamente).
+
+    El payload guarda la versión de la clave leída antes de consultar la base
+    y solo se usa mientras coincida con la actual: si una lectura vieja lo
+    escribe después de invalidate(), queda con una versión ya superada.
+
+    Args:
+        key (str): Clave de cache
+        build (callable): Arma (status, data, last_modified) desde la base
+
+    Returns:
+        dict: status, data, etag y last_modified (timestamp o None)
+    """
+    try:
+        cached = cache.get_many([key, _version_key(key)])
+    except Exception as exc:
+        logger.warning("Cache no disponible para %s: %s", key, exc)
+        cached = {}
+    version = cached.get(_version_key(key), 0)
+    payload = cached.get(key)
+    if payload is not None and payload.get("version") == version:
+        return payload
+
+    status, data, last_modified = build()
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    payload = {
+        "status": status,
+        "data": data,
+        "etag": quote_etag(hashlib.sha256(body.encode()).hexdigest()[:32]),
+        "last_modified": last_modified.timestamp() if last_modified else None,
+        "version": version,
+    }
+    try:
+        cache.set(key, payload, None)
+    except Exception as exc:
+        logger.warning("No se pudo cachear %s: %s", key, exc)
+    return payload
+
+
+def not_modified(request, payload):
+    """Indica si el cliente ya tiene la versión actual (If-None-Match / If-Modified-Since)"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return payload["etag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if since is not None and payload["last_modified"] is not None:
+        return int(payload["last_modified"]) <= since
+    return False
+
+
+def apply_validators(response, payload):
+    """Agrega ETag, Last-Modified y Cache-Control de revalidación a la respuesta"""
+    response["ETag"] = payload["etag"]
+    if payload["last_modified"] is not None:
+        response["Last-Modified"] = http_date(payload["last_modified"])
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def invalidate(key):
+    """Sube la versión de la clave al hacer commit, para no re-cachear un estado sin confirmar"""
+    def _bump():
+        try:
+            try:
+                cache.incr(_version_key(key))
+            except ValueError:
+                # Sin versión previa (lecturas con versión 0)
+                cache.set(_version_key(key), 1, None)
+        except Exception as exc:
+            logger.warning("No se pudo invalidar %s: %s", key, exc)
+    transaction.on_commit(_bump)
@@ -0,0 +1,82 @@
+import time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Contestant, EmailVerificationToken, OutboxMessage
+
+
+def delete_in_batches(queryset, batch_size, pause=0):
+    """
+    Borra las filas de un queryset en lotes acotados.
+
+    Cada lote es un SELECT de ids por índice seguido de un DELETE ... WHERE id IN,
+    en su propia transacción (autocommit), así los locks duran poco aunque
+    haya millones de filas por borrar.
+
+    Args:
+        queryset (QuerySet): Filas a borrar
+        batch_size (int): Filas por lote
+        pause (float): Segundos de espera entre lotes
+
+    Returns:
+        int: Filas borradas del modelo del queryset
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        _, per_model = model.objects.filter(pk__in=ids).delete()
+        deleted += per_model.get(model._meta.label, 0)
+        if pause:
+            time.sleep(pause)
+
+
+# Valor por defecto de unverified_max_age: tomar UNVERIFIED_CONTESTANT_MAX_AGE
+# (None queda libre para "no borrar concursantes")
+FROM_SETTINGS = object()
+
+
+def purge_stale_records(batch_size=None, retention=None, unverified_max_age=FROM_SETTINGS, pause=0):
+    """
+    Limpia tokens vencidos/usados, outbox publicado y concursantes sin verificar.
+
+    Args:
+        batch_size (int): Filas por lote (por defecto PURGE_BATCH_SIZE)
+        retention (timedelta): Tiempo que se conservan tokens y outbox después
+            de vencer/usarse/publicarse (por defecto TOKEN_RETENTION)
+        unverified_max_age (timedelta | None): Edad desde la que se borran
+            concursantes sin verificar (por defecto UNVERIFIED_CONTESTANT_MAX_AGE;
+            None o timedelta(0) no los borra)
+        pause (float): Segundos de espera entre lotes
+
+    Returns:
+        dict: Filas borradas por tipo
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    retention = settings.TOKEN_RETENTION if retention is None else retention
+    if unverified_max_age is FROM_SETTINGS:
+        unverified_max_age = settings.UNVERIFIED_CONTESTANT_MAX_AGE
+    cutoff = timezone.now() - retention
+
+    result = {
+        "tokens": delete_in_batches(
+            EmailVerificationToken.objects.filter(Q(expires_at__lt=cutoff) | Q(used_at__lt=cutoff)),
+            batch_size, pause,
+        ),
+        "outbox": delete_in_batches(
+            OutboxMessage.objects.filter(published_at__lt=cutoff), batch_size, pause,
+        ),
+        "contestants": 0,
+    }
+    if unverified_max_age:
+        result["contestants"] = delete_in_batches(
+            Contestant.objects.filter(
+                is_verified=False, created_at__lt=timezone.now() - unverified_max_age
+            ),
+            batch_size, pause,
+        )
+    return result
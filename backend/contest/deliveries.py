@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import Contestant, EmailDelivery, EmailVerificationToken
+
+
+UPSERT_FIELDS = ["status", "attempts", "last_error", "sent_at", "updated_at"]
+
+
+def record_deliveries(kind, outcomes):
+    """
+    Guarda el resultado de un intento de envío para varios mensajes con un solo upsert.
+
+    Args:
+        kind (str): EmailDelivery.VERIFICATION o EmailDelivery.WINNER
+        outcomes (list[tuple]): (contestant_id, reference, status, attempts, error)
+
+    Returns:
+        list[EmailDelivery]: Filas escritas
+    """
+    now = timezone.now()
+    deliveries = [
+        EmailDelivery(
+            kind=kind,
+            contestant_id=contestant_id,
+            reference=reference or "",
+            status=status,
+            attempts=attempts,
+            last_error=(error or "")[:1000],
+            sent_at=now if status == EmailDelivery.SENT else None,
+        )
+        for contestant_id, reference, status, attempts, error in outcomes
+    ]
+    if not deliveries:
+        return []
+    return EmailDelivery.objects.bulk_create(
+        deliveries,
+        update_conflicts=True,
+        unique_fields=["kind", "contestant", "reference"],
+        update_fields=UPSERT_FIELDS,
+    )
+
+
+def _valid_tokens(contestant_ids):
+    """
+    Último token vigente por concursante; crea uno nuevo para los que no tienen.
+
+    Todos quedan con sent_at, porque se reenvían por un task individual y el
+    drenado por lotes no debe tomarlos.
+    """
+    now = timezone.now()
+    tokens = {}
+    for token in (
+        EmailVerificationToken.objects
+        .filter(contestant_id__in=contestant_ids, used_at__isnull=True, expires_at__gt=now)
+        .order_by("contestant_id", "-created_at")
+    ):
+        tokens.setdefault(token.contestant_id, token)
+    EmailVerificationToken.objects.filter(
+        id__in=[t.id for t in tokens.values()], sent_at__isnull=True
+    ).update(sent_at=now)
+    missing = [cid for cid in contestant_ids if cid not in tokens]
+    for token in EmailVerificationToken.objects.bulk_create(
+        [EmailVerificationToken(contestant_id=cid, sent_at=now) for cid in missing]
+    ):
+        tokens[token.contestant_id] = token
+    return tokens
+
+
+def requeue_deliveries(queryset):
+    """
+    Vuelve a encolar (vía outbox) los envíos seleccionados, en lote.
+
+    Verificaciones: se toma el envío más reciente por concursante, se omite si
+    ya está verificado y se reenvía con su token vigente (o uno nuevo si el
+    original venció). El envío reencolado es la fila (tipo, concursante,
+    token): se crea o, si ya existía, pasa a pending con un solo upsert, así
+    que la fila del token vencido conserva su historial de fallos.
+
+    Returns:
+        int: Envíos reencolados
+    """
+    from .tasks import send_verification_email, send_winner_notification
+
+    deliveries = list(queryset.exclude(status=EmailDelivery.PENDING).order_by("id"))
+    winners = [d for d in deliveries if d.kind == EmailDelivery.WINNER]
+    latest = {d.contestant_id: d for d in deliveries if d.kind == EmailDelivery.VERIFICATION}
+    unverified = set(
+        Contestant.objects.filter(id__in=list(latest), is_verified=False).values_list("id", flat=True)
+    )
+    verifications = [d for cid, d in latest.items() if cid in unverified]
+
+    with transaction.atomic():
+        tokens = _valid_tokens([d.contestant_id for d in verifications])
+        references = {d.contestant_id: str(tokens[d.contestant_id].token) for d in verifications}
+        requeued = [
+            EmailDelivery(kind=EmailDelivery.WINNER, contestant_id=d.contestant_id, reference=d.reference)
+            for d in winners
+        ] + [
+            EmailDelivery(kind=EmailDelivery.VERIFICATION, contestant_id=cid, reference=reference)
+            for cid, reference in references.items()
+        ]
+        EmailDelivery.objects.bulk_create(
+            requeued,
+            update_conflicts=True,
+            unique_fields=["kind", "contestant", "reference"],
+            update_fields=["status", "updated_at"],
+        )
+        outbox.enqueue_many(send_winner_notification, [(d.contestant_id,) for d in winners])
+        outbox.enqueue_many(send_verification_email, list(references.items()))
+    return len(requeued)
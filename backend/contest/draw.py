@@ -0,0 +1,166 @@
+import math
+import random
+import secrets
+
+from django.db.models import Max, Min
+
+from .instrumentation import timed_function
+from .models import Contestant, WinnerDraw
+
+
+# Candidatos que se prueban por consulta en el muestreo por rechazo
+CANDIDATES_PER_QUERY = 32
+# Tope de candidatos por consulta (parámetros del IN)
+MAX_CANDIDATES_PER_QUERY = 5000
+# Consultas de muestreo antes de contar los elegibles
+MAX_SAMPLING_QUERIES = 4
+# Solo se cargan los ids elegibles si faltan al menos 1/POOL_FRACTION de ellos
+POOL_FRACTION = 4
+# Margen sobre el lote estimado a partir de la densidad de elegibles
+BATCH_MARGIN = 1.25
+
+
+def new_seed():
+    """Genera una semilla auditable para el sorteo (cabe en un BIGINT)"""
+    return secrets.randbits(63)
+
+
+def eligible_contestants():
+    return Contestant.objects.filter(is_verified=True)
+
+
+def draw_contestant(seed, exclude_ids=()):
+    """
+    Elige un concursante verificado al azar, con probabilidad uniforme.
+
+    Equivale a sample_contestants(seed, 1, exclude_ids).
+
+    Returns:
+        Contestant | None: Ganador, o None si no hay elegibles
+    """
+    sample = sample_contestants(seed, 1, exclude_ids)
+    return sample[0] if sample else None
+
+
+def _batch_size(remaining, density):
+    """Candidatos para encontrar remaining elegibles con la densidad estimada"""
+    batch = math.ceil(remaining / density * BATCH_MARGIN)
+    return min(max(batch, CANDIDATES_PER_QUERY), MAX_CANDIDATES_PER_QUERY)
+
+
+def _rejection_round(rng, eligible, lo, hi, chosen, k, batch):
+    """
+    Prueba un lote de ids al azar y agrega a chosen los elegibles, en orden de salida.
+
+    Returns:
+        tuple[int, int]: Elegibles encontrados e ids distintos consultados
+    """
+    candidates = [rng.randint(lo, hi) for _ in range(batch)]
+    queried = set(candidates) - chosen.keys()
+    found = {c.id: c for c in eligible.filter(id__in=queried)}
+    for candidate in candidates:
+        if candidate in found and candidate not in chosen:
+            chosen[candidate] = found[candidate]
+            if len(chosen) == k:
+                break
+    return len(found), len(queried)
+
+
+@timed_function("draw")
+def sample_contestants(seed, k, exclude_ids=()):
+    """
+    Elige k concursantes verificados distintos al azar (muestreo sin reemplazo).
+
+    Muestreo por rechazo sobre el rango de ids del índice parcial
+    contestant_eligible_id: se generan ids al azar en [min, max] y se aceptan,
+    en orden de generación, los que corresponden a un concursante elegible aún
+    no elegido. Cada consulta es un lookup por índice de un lote de candidatos,
+    sin ORDER BY RANDOM() ni un sort por ganador. El tamaño de cada lote sale
+    de la densidad de elegibles observada en los anteriores.
+
+    Si tras MAX_SAMPLING_QUERIES consultas faltan ganadores, se cuentan los
+    elegibles restantes: si faltan pocos respecto a ellos se sigue muestreando
+    con la densidad exacta; solo si se pide una fracción grande (o el rango es
+    muy disperso) se muestrea sobre la lista de ids, de tamaño proporcional a k.
+
+    Con la misma semilla y el mismo estado de la base el resultado es el mismo,
+    lo que permite auditar el sorteo.
+
+    Args:
+        seed (int): Semilla del generador, se guarda junto al sorteo
+        k (int): Cantidad de concursantes a elegir
+        exclude_ids (Iterable[int]): Concursantes que no pueden salir
+
+    Returns:
+        list[Contestant]: Hasta k concursantes, en el orden en que salieron
+    """
+    rng = random.Random(seed)
+    exclude_ids = set(exclude_ids)
+    eligible = eligible_contestants()
+    if exclude_ids:
+        eligible = eligible.exclude(id__in=exclude_ids)
+
+    bounds = eligible_contestants().aggregate(lo=Min("id"), hi=Max("id"))
+    lo, hi = bounds["lo"], bounds["hi"]
+    if lo is None or k <= 0:
+        return []
+
+    chosen = {}
+    hits = queried = 0
+    for attempt in range(MAX_SAMPLING_QUERIES):
+        remaining = k - len(chosen)
+        if hits:
+            batch = _batch_size(remaining, hits / queried)
+        else:
+            # Sin aciertos todavía: lotes crecientes
+            batch = min(max(CANDIDATES_PER_QUERY, 2 * remaining) << attempt, MAX_CANDIDATES_PER_QUERY)
+        round_hits, round_queried = _rejection_round(rng, eligible, lo, hi, chosen, k, batch)
+        hits += round_hits
+        queried += round_queried
+        if len(chosen) == k:
+            return list(chosen.values())
+
+    rest = eligible.exclude(id__in=list(chosen))
+    available = rest.count()
+    goal = len(chosen) + min(k - len(chosen), available)
+    if (goal - len(chosen)) * POOL_FRACTION >= available:
+        # Se pide una fracción grande de los restantes: el pool es O(k)
+        pool = list(rest.order_by("id").values_list("id", flat=True))
+        extra_ids = rng.sample(pool, goal - len(chosen))
+        extra = Contestant.objects.in_bulk(extra_ids)
+        return list(chosen.values()) + [extra[i] for i in extra_ids]
+
+    # Quedan al menos 3/4 de los elegibles sin elegir: el muestreo converge
+    density = available / (hi - lo + 1)
+    while len(chosen) < goal:
+        _rejection_round(rng, eligible, lo, hi, chosen, goal, _batch_size(goal - len(chosen), density))
+    return list(chosen.values())
+
+
+def draw_campaign(campaign, seed):
+    """
+    Sortea ganadores y suplentes de una campaña en una sola pasada.
+
+    Los primeros winners_count que salen son ganadores y el resto suplentes,
+    en orden de salida. Todas las filas se escriben con un único bulk insert.
+
+    Args:
+        campaign (Campaign): Campaña a sortear
+        seed (int): Semilla del generador
+
+    Returns:
+        list[WinnerDraw]: Sorteos creados (puede haber menos si faltan elegibles)
+    """
+    total = campaign.winners_count + campaign.alternates_count
+    sample = sample_contestants(seed, total)
+    draws = [
+        WinnerDraw(
+            campaign=campaign,
+            contestant=contestant,
+            position=position,
+            is_alternate=position > campaign.winners_count,
+            seed=seed,
+        )
+        for position, contestant in enumerate(sample, start=1)
+    ]
+    return WinnerDraw.objects.bulk_create(draws)
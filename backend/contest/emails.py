@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+
+from .models import TOKEN_EXPIRY
+
+
+BRANDING_SETTINGS = {"HOTEL_NAME", "HOTEL_TAGLINE", "BRAND_COLOR", "CONTEST_PRIZE", "FRONTEND_URL"}
+
+
+@lru_cache(maxsize=None)
+def branding_context():
+    """Contexto de marca común a todos los emails (se arma una vez por proceso)"""
+    return {
+        "hotel_name": settings.HOTEL_NAME,
+        "tagline": settings.HOTEL_TAGLINE,
+        "brand_color": settings.BRAND_COLOR,
+        "prize": settings.CONTEST_PRIZE,
+        "frontend_url": settings.FRONTEND_URL,
+        "token_expiry_hours": int(TOKEN_EXPIRY.total_seconds() // 3600),
+    }
+
+
+@lru_cache(maxsize=None)
+def _template(name):
+    # Compila cada template una sola vez por proceso worker
+    return get_template(f"contest/emails/{name}")
+
+
+@receiver(setting_changed)
+def _reset_email_caches(*, setting, **kwargs):
+    if setting in BRANDING_SETTINGS:
+        branding_context.cache_clear()
+    elif setting == "TEMPLATES":
+        _template.cache_clear()
+
+
+def _render(name, context):
+    context = {**branding_context(), **context}
+    return (
+        _template(f"{name}.txt").render(context).strip(),
+        _template(f"{name}.html").render(context),
+    )
+
+
+def render_verification_email(contestant, token):
+    """
+    Renderiza el email de verificación.
+
+    Args:
+        contestant (Contestant): Concursante destinatario
+        token (str): Token UUID para verificación de email
+
+    Returns:
+        tuple: (asunto, texto plano, HTML)
+    """
+    text, html = _render("verification", {
+        "full_name": contestant.full_name,
+        "verification_url": f"{branding_context()['frontend_url']}/verify?token={token}",
+    })
+    subject = f"[{settings.HOTEL_NAME}] Verifica tu email – Concurso San Valentín"
+    return subject, text, html
+
+
+def render_winner_email(contestant):
+    """
+    Renderiza la notificación al ganador.
+
+    Returns:
+        tuple: (asunto, texto plano, HTML)
+    """
+    text, html = _render("winner", {"full_name": contestant.full_name})
+    subject = f"🎉 ¡FELICIDADES! Eres el ganador – {settings.HOTEL_NAME}"
+    return subject, text, html
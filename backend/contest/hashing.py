@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .instrumentation import timed_function
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 con el costo tomado de settings (ARGON2_TIME_COST, ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM). Conserva el algoritmo "argon2", así que los hashes son
+    compatibles con el hasher de Django y must_update() los re-hashea al login
+    cuando cambia el costo.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    workers = settings.PASSWORD_HASH_WORKERS
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        return _executor
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == "PASSWORD_HASH_WORKERS" and _executor is not None:
+        with _executor_lock:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+@timed_function("hash")
+def hash_password(raw_password):
+    """
+    Hashea una contraseña con el hasher por defecto.
+
+    Con PASSWORD_HASH_WORKERS > 0 se hashea en un pool acotado: como mucho ese
+    número de hashes corre a la vez, sin importar cuántas requests lleguen.
+
+    Returns:
+        str: Hash codificado para User.password
+    """
+    executor = _get_executor()
+    if executor is None:
+        return make_password(raw_password)
+    return executor.submit(make_password, raw_password).result()
+
+
+@timed_function("hash")
+async def ahash_password(raw_password):
+    """Igual que hash_password, sin bloquear el event loop (camino ASGI)"""
+    executor = _get_executor()
+    if executor is None:
+        # Sin pool dedicado se usa el executor por defecto del loop
+        return await asyncio.to_thread(make_password, raw_password)
+    return await asyncio.get_running_loop().run_in_executor(executor, make_password, raw_password)
+
+
+def preload_password_validators():
+    """
+    Instancia los validadores de AUTH_PASSWORD_VALIDATORS (quedan cacheados).
+
+    CommonPasswordValidator lee y descomprime su lista de ~20.000 contraseñas al
+    construirse; al hacerlo en el arranque la primera verificación no paga ese costo.
+    """
+    from django.contrib.auth.password_validation import get_default_password_validators
+
+    return get_default_password_validators()
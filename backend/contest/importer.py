@@ -0,0 +1,158 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import outbox, stats
+from .models import Contestant, EmailVerificationToken
+from .tasks import send_pending_verification_emails
+from .utils import normalize_contestant_fields
+
+
+IMPORT_FIELDS = ("first_name", "last_name", "second_last_name", "email", "phone")
+# Máximo de errores detallados que se devuelven en el resumen
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+def iter_records(stream, fmt):
+    """
+    Lee registros de un archivo CSV o JSONL sin cargarlo completo en memoria.
+
+    Args:
+        stream (TextIO): Archivo abierto en modo texto
+        fmt (str): 'csv' o 'jsonl'
+
+    Yields:
+        tuple: (número de línea, dict con los campos o None si la línea es inválida)
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_num, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def _clean_record(record):
+    data = {name: (record.get(name) or "") for name in IMPORT_FIELDS}
+    data = {name: str(value) for name, value in data.items()}
+    data = normalize_contestant_fields(data)
+    contestant = Contestant(**data)
+    # Validadores de campo del modelo (email, teléfono, largos); la unicidad
+    # se resuelve por lote contra la base.
+    contestant.clean_fields(exclude=["user", "is_verified", "search_text"])
+    contestant.refresh_search_text()
+    return contestant
+
+
+def _import_chunk(rows, result, send_emails):
+    candidates = {}
+    for line_num, record in rows:
+        if record is None:
+            result.add_error(line_num, "Registro mal formado.")
+            continue
+        try:
+            contestant = _clean_record(record)
+        except ValidationError as exc:
+            result.add_error(line_num, "; ".join(
+                f"{name}: {' '.join(messages)}" for name, messages in exc.message_dict.items()
+            ))
+            continue
+        if contestant.email in candidates:
+            result.duplicates += 1
+            continue
+        candidates[contestant.email] = contestant
+
+    if not candidates:
+        return
+
+    for attempt in range(2):
+        # Una sola consulta por lote para descartar emails ya inscritos
+        existing = set(
+            Contestant.objects.filter(email__in=list(candidates)).values_list("email", flat=True)
+        )
+        new = [c for email, c in candidates.items() if email not in existing]
+        try:
+            with transaction.atomic():
+                created = Contestant.objects.bulk_create(new)
+                # Sin envío, sent_at deja los tokens fuera del drenado por lotes
+                sent_at = None if send_emails else timezone.now()
+                EmailVerificationToken.objects.bulk_create(
+                    [EmailVerificationToken(contestant=c, sent_at=sent_at) for c in created]
+                )
+                stats.record_registrations(len(created))
+        except IntegrityError:
+            # Otro proceso inscribió alguno de estos emails entre la consulta y el insert
+            if attempt:
+                raise
+            for c in new:
+                c.pk = None
+            continue
+        result.duplicates += len(existing)
+        result.created += len(created)
+        return
+
+
+def import_contestants(stream, fmt, batch_size=1000, send_emails=False):
+    """
+    Importa concursantes en lotes desde un archivo CSV o JSONL.
+
+    Cada lote se normaliza y valida en memoria, se deduplica contra la base con
+    una sola consulta y se inserta con bulk_create (concursantes + tokens) en
+    una transacción. La memoria usada depende del tamaño de lote, no del archivo.
+
+    Args:
+        stream (TextIO): Archivo abierto en modo texto
+        fmt (str): 'csv' o 'jsonl'
+        batch_size (int): Filas por lote
+        send_emails (bool): Encolar el email de verificación de los inscritos
+
+    Returns:
+        ImportResult: Resumen con creados, duplicados e inválidos
+    """
+    result = ImportResult()
+    records = iter_records(stream, fmt)
+    while True:
+        rows = list(islice(records, batch_size))
+        if not rows:
+            break
+        _import_chunk(rows, result, send_emails)
+
+    if send_emails and result.created:
+        # Un solo task drena todos los tokens nuevos por lotes, con una conexión SMTP
+        outbox.enqueue(send_pending_verification_emails)
+    return result
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse
+
+
+logger = logging.getLogger("contest.profiling")
+
+# Queries que se guardan por request para el log de requests lentas
+MAX_CAPTURED_QUERIES = 200
+
+_profile = ContextVar("contest_request_profile", default=None)
+
+
+class RequestProfile:
+    """Tiempos acumulados de una request: fases (serialize, hash, enqueue...) y base de datos"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.active = set()
+        self.db_time = 0.0
+        self.db_count = 0
+        self.queries = []
+
+    def add(self, phase, elapsed):
+        total, count = self.phases.get(phase, (0.0, 0))
+        self.phases[phase] = (total + elapsed, count + 1)
+
+    def record_query(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.db_time += elapsed
+            self.db_count += 1
+            if len(self.queries) < MAX_CAPTURED_QUERIES:
+                self.queries.append({"sql": sql, "ms": round(elapsed * 1000, 3)})
+
+    def server_timing(self, total):
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"']
+        entries += [f"{phase};dur={elapsed * 1000:.1f}" for phase, (elapsed, _) in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Suma el tiempo del bloque a la fase indicada de la request en curso.
+
+    Sin RequestProfilingMiddleware activo es un no-op. Las llamadas anidadas
+    a la misma fase (ej. serializers anidados) se cuentan una sola vez.
+    """
+    profile = _profile.get()
+    if profile is None or phase in profile.active:
+        yield
+        return
+    profile.active.add(phase)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.active.discard(phase)
+        profile.add(phase, time.perf_counter() - t0)
+
+
+def timed_function(phase):
+    """Decorador equivalente a timed(phase); soporta funciones sync y async"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed(phase):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TimedSerializerMixin:
+    """Mide validación y serialización de un serializer DRF en las fases validate/serialize"""
+
+    def is_valid(self, *args, **kwargs):
+        with timed("validate"):
+            return super().is_valid(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+@contextmanager
+def _recording_queries(profile):
+    """Registra en profile las queries de las conexiones del hilo/contexto actual"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile.record_query))
+        yield
+
+
+class RequestProfilingMiddleware:
+    """
+    Perfila cada request (opt-in con REQUEST_PROFILING=1).
+
+    Cuenta y mide las queries con connection.execute_wrapper, suma las fases
+    marcadas con timed() y publica el resultado en el header Server-Timing y
+    en una línea de log JSON (logger contest.profiling). Las requests que
+    superan REQUEST_PROFILING_SLOW_MS se loguean como warning con su SQL.
+
+    Es sync y async: bajo ASGI no obliga a correr la cadena en un hilo. Las
+    queries de las views async que corren en otro hilo (sync_to_async) usan
+    otra conexión y no se cuentan.
+
+    En respuestas en streaming (export CSV) las queries ocurren al recorrer el
+    contenido: Server-Timing solo mide hasta armar la respuesta y la línea de
+    log se escribe al terminar el stream, con sus queries incluidas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            with _recording_queries(profile):
+                response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            with _recording_queries(profile):
+                response = await self.get_response(request)
+        finally:
+            _profile.reset(token)
+        return self._finish(request, response, profile)
+
+    def _finish(self, request, response, profile):
+        response["Server-Timing"] = profile.server_timing(time.perf_counter() - profile.started)
+        # Un archivo (FileResponse) no consulta la base: se deja con su file_wrapper
+        if response.streaming and not isinstance(response, FileResponse):
+            stream = self._aprofile_stream if response.is_async else self._profile_stream
+            response.streaming_content = stream(response.streaming_content, request, response, profile)
+        else:
+            self._log(request, response, profile, time.perf_counter() - profile.started)
+        return response
+
+    def _profile_stream(self, content, request, response, profile):
+        try:
+            with _recording_queries(profile):
+                yield from content
+        finally:
+            self._log(request, response, profile, time.perf_counter() - profile.started)
+
+    async def _aprofile_stream(self, content, request, response, profile):
+        try:
+            with _recording_queries(profile):
+                async for part in content:
+                    yield part
+        finally:
+            self._log(request, response, profile, time.perf_counter() - profile.started)
+
+    def _log(self, request, response, profile, total):
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "db_ms": round(profile.db_time * 1000, 1),
+            "db_queries": profile.db_count,
+            "phases": {
+                phase: {"ms": round(elapsed * 1000, 1), "calls": count}
+                for phase, (elapsed, count) in profile.phases.items()
+            },
+        }
+        if total * 1000 >= settings.REQUEST_PROFILING_SLOW_MS:
+            record["slow"] = True
+            record["queries"] = profile.queries
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
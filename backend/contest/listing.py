@@ -0,0 +1,67 @@
+from django.db.models import Case, CharField, Value, When
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .instrumentation import timed_function
+
+
+# Mismas claves y orden que ContestantSerializer
+CONTESTANT_LIST_FIELDS = (
+    "id", "first_name", "last_name", "second_last_name", "full_name",
+    "email", "phone", "is_verified", "created_at",
+)
+
+# full_name calculado en SQL, igual que la property Contestant.full_name
+FULL_NAME = Concat(
+    "first_name", Value(" "), "last_name",
+    Case(
+        When(second_last_name="", then=Value("")),
+        default=Concat(Value(" "), "second_last_name"),
+    ),
+    output_field=CharField(),
+)
+
+
+def contestant_rows(queryset):
+    """
+    Proyecta el listado admin a dicts (.values()), sin instanciar modelos.
+
+    Returns:
+        QuerySet: Filas dict con las columnas de CONTESTANT_LIST_FIELDS
+    """
+    columns = [name for name in CONTESTANT_LIST_FIELDS if name != "full_name"]
+    return queryset.values(*columns, full_name=FULL_NAME)
+
+
+def _format_datetime(value, tz):
+    # Igual que DateTimeField.to_representation de DRF con el formato ISO 8601
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+@timed_function("serialize")
+def render_contestant_rows(rows):
+    """
+    Serializa filas de contestant_rows() con la misma salida que
+    ContestantSerializer(many=True), sin la maquinaria de campos de DRF.
+
+    Returns:
+        list[dict]: Filas listas para la respuesta JSON
+    """
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            "id": row["id"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "second_last_name": row["second_last_name"],
+            "full_name": row["full_name"],
+            "email": row["email"],
+            "phone": row["phone"],
+            "is_verified": row["is_verified"],
+            "created_at": _format_datetime(row["created_at"], tz) if row["created_at"] else None,
+        }
+        for row in rows
+    ]
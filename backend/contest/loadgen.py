@@ -0,0 +1,100 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Contestant, EmailVerificationToken
+from .utils import fold_search_text
+
+
+FIRST_NAMES = (
+    "José", "María", "Juan", "Francisca", "Diego", "Camila", "Matías", "Valentina", "Benjamín",
+    "Javiera", "Vicente", "Catalina", "Tomás", "Antonia", "Sebastián", "Fernanda", "Joaquín",
+    "Isidora", "Agustín", "Sofía", "Cristóbal", "Constanza", "Ignacio", "Martina", "Felipe",
+)
+LAST_NAMES = (
+    "González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez",
+    "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya",
+    "Flores", "Espinoza", "Valenzuela", "Castillo", "Tapia", "Reyes", "Gutiérrez", "Castro",
+    "Pizarro", "Álvarez", "Vásquez", "Sánchez", "Fernández", "Ramírez", "Carrasco", "Núñez",
+)
+# Dominios reservados (RFC 2606): un relay o sorteo fuera de los tests no
+# puede mandar correos a personas reales
+EMAIL_DOMAINS = ("example.com", "example.net", "example.org")
+# Contraseña de los usuarios generados (se hashea una sola vez)
+GENERATED_PASSWORD = "Cl4ve-Generada!"
+
+
+def _contestant(rng, index, now, verified_ratio):
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    second = rng.choice(LAST_NAMES) if rng.random() < 0.8 else ""
+    local = fold_search_text(f"{first}.{last}").replace(" ", "")
+    contestant = Contestant(
+        first_name=first,
+        last_name=last,
+        second_last_name=second,
+        email=f"{local}.{index}@{rng.choice(EMAIL_DOMAINS)}",
+        phone=f"+569{rng.randrange(10**8):08d}",
+    )
+    contestant.refresh_search_text()
+    if rng.random() < verified_ratio:
+        contestant.is_verified = True
+        contestant.verified_at = now - timedelta(minutes=rng.randrange(60 * 24 * 30))
+    # Se sortea aquí para que los datos no dependan del tamaño de lote
+    token = uuid.UUID(int=rng.getrandbits(128), version=4)
+    return contestant, token
+
+
+def generate_contestants(count, seed=0, start=0, batch_size=5000, verified_ratio=0.6, progress=None):
+    """
+    Genera concursantes realistas con sus tokens y, si están verificados, su User.
+
+    Con la misma semilla y el mismo start se generan exactamente los mismos datos
+    (nombres, emails, teléfonos, tokens). Cada lote se escribe con bulk_create en
+    una transacción: users, concursantes y tokens. Los emails llevan el índice
+    global, así que start permite agregar más filas sin chocar con las anteriores.
+
+    Args:
+        count (int): Concursantes a generar
+        seed (int): Semilla del generador
+        start (int): Índice del primer concursante
+        batch_size (int): Filas por lote
+        verified_ratio (float): Fracción de concursantes verificados
+        progress (callable): Se llama con el total generado tras cada lote
+
+    Returns:
+        dict: Totales creados por tabla
+    """
+    rng = random.Random(f"{seed}:{start}")
+    password = make_password(GENERATED_PASSWORD)
+    now = timezone.now()
+    totals = {"contestants": 0, "tokens": 0, "users": 0}
+
+    for offset in range(start, start + count, batch_size):
+        size = min(batch_size, start + count - offset)
+        generated = [_contestant(rng, offset + i, now, verified_ratio) for i in range(size)]
+        contestants = [contestant for contestant, _ in generated]
+        with transaction.atomic():
+            verified = [c for c in contestants if c.is_verified]
+            users = User.objects.bulk_create([
+                User(username=c.email, email=c.email, password=password, date_joined=c.verified_at)
+                for c in verified
+            ])
+            for contestant, user in zip(verified, users):
+                contestant.user = user
+            created = Contestant.objects.bulk_create(contestants)
+            tokens = EmailVerificationToken.objects.bulk_create([
+                EmailVerificationToken(contestant=c, token=token, sent_at=now, used_at=c.verified_at)
+                for c, (_, token) in zip(created, generated)
+            ])
+        totals["contestants"] += len(created)
+        totals["tokens"] += len(tokens)
+        totals["users"] += len(users)
+        if progress is not None:
+            progress(totals["contestants"])
+    return totals
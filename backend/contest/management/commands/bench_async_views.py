@@ -0,0 +1,120 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from contest.bench import format_summary, own_outbox_ids, summarize
+from contest.models import Contestant, EmailVerificationToken, OutboxMessage
+from contest.stats import reconcile_stats
+from contest.tasks import send_verification_email
+
+
+PASSWORD = "Cl4ve-Segura!2024"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara inscripción y verificación por el camino WSGI (views DRF, hilos) "
+        "y el ASGI (views async, un event loop). Crea concursantes bench-* y al final "
+        "borra solo las filas que creó; sin DEBUG pide --allow-live-db."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--allow-live-db", action="store_true",
+            help="Permite correr con DEBUG=False (la base no es desechable)",
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or options["allow_live_db"]):
+            raise CommandError(
+                "bench_async_views escribe en la base configurada y DEBUG=False: úsalo sobre una base "
+                "desechable o confirma con --allow-live-db"
+            )
+        total, concurrency = options["requests"], options["concurrency"]
+        first_outbox_id = OutboxMessage.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        created_emails = []
+        overrides = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            # Sin throttles: todas las requests vienen de la misma IP
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}},
+        )
+        try:
+            with overrides:
+                for path, runner in (("wsgi", self._run_wsgi), ("asgi", self._run_asgi)):
+                    suffix = "" if path == "wsgi" else "-async"
+                    emails = [f"bench-{path}-{uuid.uuid4().hex[:12]}@example.com" for _ in range(total)]
+                    created_emails.extend(emails)
+                    self._report(f"{path} inscripción", runner(
+                        reverse(f"contest:contestants{suffix}"),
+                        [self._registration(email) for email in emails], concurrency,
+                    ))
+                    tokens = EmailVerificationToken.objects.filter(
+                        contestant__email__in=emails
+                    ).values_list("token", flat=True)
+                    self._report(f"{path} verificación", runner(
+                        reverse(f"contest:verification{suffix}"),
+                        [self._verification(token) for token in tokens], concurrency,
+                    ))
+        finally:
+            # Solo lo que creó el benchmark: la base puede estar recibiendo tráfico real
+            contestants = Contestant.objects.filter(email__in=created_emails)
+            outbox_ids = own_outbox_ids(
+                send_verification_email, contestants.values_list("id", flat=True), first_outbox_id
+            )
+            OutboxMessage.objects.filter(id__in=outbox_ids).delete()
+            contestants.delete()
+            User.objects.filter(username__in=created_emails).delete()
+            # Los contadores del dashboard sumaron inscripciones y verificaciones ya borradas
+            reconcile_stats()
+
+    def _registration(self, email):
+        return {"first_name": "Bench", "last_name": "Carga", "email": email, "phone": "+56912345678"}
+
+    def _verification(self, token):
+        return {"token": str(token), "password": PASSWORD, "password_confirm": PASSWORD}
+
+    def _report(self, name, result):
+        samples, wall_time, errors = result
+        self.stdout.write(format_summary(name, summarize(samples, wall_time)) + f" errores={errors}")
+
+    def _run_wsgi(self, url, payloads, concurrency):
+        def call(payload):
+            client = Client()
+            t0 = time.perf_counter()
+            response = client.post(url, payload, content_type="application/json")
+            elapsed = time.perf_counter() - t0
+            close_old_connections()
+            return elapsed, response.status_code >= 400
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, payloads))
+        return [r[0] for r in results], time.perf_counter() - start, sum(r[1] for r in results)
+
+    def _run_asgi(self, url, payloads, concurrency):
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def call(payload):
+                async with semaphore:
+                    t0 = time.perf_counter()
+                    response = await client.post(url, payload, content_type="application/json")
+                    return time.perf_counter() - t0, response.status_code >= 400
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(call(p) for p in payloads))
+            return [r[0] for r in results], time.perf_counter() - start, sum(r[1] for r in results)
+
+        return asyncio.run(run())
@@ -0,0 +1,50 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from contest import emails
+from contest.bench import format_summary, time_calls
+from contest.models import Contestant
+
+
+class Command(BaseCommand):
+    help = "Mide el costo de renderizar cada email (sin enviar ni tocar la base)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        contestant = Contestant(
+            first_name="José", last_name="Núñez", second_last_name="Pérez",
+            email="jose@example.com", phone="+56912345678",
+        )
+        token = str(uuid.uuid4())
+
+        # Calentamiento: compila y cachea templates y contexto de marca
+        emails.render_verification_email(contestant, token)
+        emails.render_winner_email(contestant)
+
+        self.stdout.write(format_summary(
+            "verificación (cacheado)",
+            time_calls(lambda: emails.render_verification_email(contestant, token), iterations),
+        ))
+        self.stdout.write(format_summary(
+            "ganador (cacheado)",
+            time_calls(lambda: emails.render_winner_email(contestant), iterations),
+        ))
+
+        # Referencia: compilar los templates en cada mensaje
+        def uncached():
+            for engine in engines.all():
+                for loader in engine.engine.template_loaders:
+                    if hasattr(loader, "reset"):
+                        loader.reset()
+            emails._template.cache_clear()
+            emails.branding_context.cache_clear()
+            emails.render_verification_email(contestant, token)
+
+        self.stdout.write(format_summary(
+            "verificación (sin cache)", time_calls(uncached, max(iterations // 10, 1)),
+        ))
@@ -0,0 +1,58 @@
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from contest.bench import format_summary, time_calls
+
+
+HASHERS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "contest.hashing.TunedArgon2PasswordHasher",
+    "bcrypt": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide por hasher el costo CPU de la verificación de email "
+        "(validadores + hash de la contraseña) y de un login (check_password)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--hashers", nargs="+", choices=sorted(HASHERS), default=["pbkdf2", "argon2"],
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        password = "Cl4ve-Segura!2024"
+
+        # Calentamiento: carga (y cachea) la lista de contraseñas comunes
+        validate_password(password)
+        self.stdout.write(format_summary(
+            "validadores", time_calls(lambda: validate_password(password), iterations * 10),
+        ))
+
+        for name in options["hashers"]:
+            with override_settings(PASSWORD_HASHERS=[HASHERS[name]]):
+                try:
+                    encoded = make_password(password)
+                except ValueError as exc:
+                    # Dependencia opcional no instalada (argon2-cffi, bcrypt)
+                    self.stdout.write(self.style.WARNING(f"{name}: {exc}"))
+                    continue
+
+                def verification():
+                    validate_password(password)
+                    make_password(password)
+
+                self.stdout.write(format_summary(
+                    f"{name} verificación", time_calls(verification, iterations),
+                ))
+                self.stdout.write(format_summary(
+                    f"{name} check_password",
+                    time_calls(lambda: check_password(password, encoded), iterations),
+                ))
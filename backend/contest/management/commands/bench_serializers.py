@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from contest.bench import format_summary, time_calls
+from contest.listing import contestant_rows, render_contestant_rows
+from contest.models import Contestant
+from contest.serializers import ContestantSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara ContestantSerializer con el camino rápido del listado admin "
+        "(.values() + full_name en SQL) por página, incluyendo la consulta"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=200)
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        page_size, iterations = options["page_size"], options["iterations"]
+
+        # Filas propias dentro de una transacción que se revierte al final
+        with transaction.atomic():
+            Contestant.objects.bulk_create([
+                Contestant(
+                    first_name="José", last_name="Núñez", second_last_name="Pérez" if i % 2 else "",
+                    email=f"bench-serializer-{i}@example.com", phone="+56912345678",
+                )
+                for i in range(page_size)
+            ])
+            page = Contestant.objects.filter(
+                email__startswith="bench-serializer-"
+            ).order_by("-created_at", "-id")[:page_size]
+
+            for name, func in (
+                ("ContestantSerializer", lambda: ContestantSerializer(page.all(), many=True).data),
+                ("values() + dicts", lambda: render_contestant_rows(contestant_rows(page.all()))),
+            ):
+                summary = time_calls(func, iterations)
+                rows_per_sec = page_size * summary["ops_per_sec"]
+                self.stdout.write(format_summary(name, summary) + f" {rows_per_sec:.0f} filas/s")
+            transaction.set_rollback(True)
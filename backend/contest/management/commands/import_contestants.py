@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contest.importer import import_contestants
+
+
+class Command(BaseCommand):
+    help = "Importa concursantes desde un archivo CSV o JSONL en lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Ruta del archivo CSV/JSONL")
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"],
+            help="Formato del archivo (por defecto según la extensión)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--send-emails", action="store_true",
+            help="Encolar el email de verificación para cada inscrito",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"No existe el archivo {path}")
+        fmt = options["format"] or ("jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv")
+
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            result = import_contestants(
+                stream, fmt,
+                batch_size=max(options["batch_size"], 1),
+                send_emails=options["send_emails"],
+            )
+
+        self.stdout.write(json.dumps(result.as_dict(), ensure_ascii=False, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f"Importados {result.created}, duplicados {result.duplicates}, inválidos {result.invalid}"
+        ))
@@ -0,0 +1,214 @@
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from contest.bench import format_summary, own_outbox_ids, summarize, time_concurrent
+from contest.listing import contestant_rows
+from contest.loadgen import FIRST_NAMES, LAST_NAMES
+from contest.models import Contestant, EmailVerificationToken, OutboxMessage, WinnerDraw
+from contest.pagination import encode_cursor
+from contest.stats import reconcile_stats
+from contest.tasks import send_verification_email
+
+
+SCENARIOS = ("register", "verify", "list", "search", "draw")
+PREFIX = "loadtest-"
+PASSWORD = "Cl4ve-Segura!2024"
+
+
+class Command(BaseCommand):
+    help = (
+        "Arnés de carga local: inscripción, verificación, listado admin (páginas "
+        "profundas y búsqueda) y sorteo, con Celery eager y el backend de mail locmem. "
+        "Reporta p50/p95/p99 y throughput. Usar sobre una base generada con generate_contestants; "
+        "sin DEBUG pide --allow-live-db."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument("--requests", type=int, default=200, help="Requests por escenario")
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--draws", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--allow-live-db", action="store_true",
+            help="Permite correr con DEBUG=False (la base no es desechable)",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options["scenarios"]
+        if not (settings.DEBUG or options["allow_live_db"]):
+            raise CommandError(
+                "loadtest escribe en la base configurada y DEBUG=False: úsalo sobre una base "
+                "desechable o confirma con --allow-live-db"
+            )
+        if "verify" in scenarios and "register" not in scenarios:
+            raise CommandError("verify usa los concursantes de register: inclúyelo en --scenarios")
+        self.options = options
+        self.rng = random.Random(options["seed"])
+        self.run_id = uuid.uuid4().hex[:8]
+        self.emails = []
+        self.first_outbox_id = self._max_id(OutboxMessage)
+
+        overrides = override_settings(
+            CELERY_TASK_ALWAYS_EAGER=True,
+            CELERY_TASK_EAGER_PROPAGATES=True,
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            # Sin throttles: todas las requests vienen de la misma IP
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}},
+        )
+        admin = User.objects.create_superuser(f"{PREFIX}admin-{self.run_id}", password=None)
+        self.admin = admin
+        self.stdout.write(f"Base: {Contestant.objects.count()} concursantes")
+        try:
+            with overrides:
+                for scenario in SCENARIOS:
+                    if scenario in scenarios:
+                        getattr(self, f"_scenario_{scenario}")()
+        finally:
+            # Solo lo que creó el arnés; los sorteos ya se revirtieron en su transacción
+            OutboxMessage.objects.filter(id__in=self._own_outbox_ids()).delete()
+            Contestant.objects.filter(email__in=self.emails).delete()
+            User.objects.filter(Q(pk=admin.pk) | Q(username__in=self.emails)).delete()
+            reconcile_stats()
+
+    def _max_id(self, model):
+        return model.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    def _own_outbox_ids(self):
+        contestant_ids = Contestant.objects.filter(email__in=self.emails).values_list("id", flat=True)
+        return own_outbox_ids(send_verification_email, contestant_ids, self.first_outbox_id)
+
+    def _client(self, admin=False):
+        client = APIClient()
+        if admin:
+            client.force_authenticate(self.admin)
+        return client
+
+    def _report(self, name, summary):
+        errors = summary.get("errors")
+        suffix = f" errores={errors}" if errors is not None else ""
+        self.stdout.write(format_summary(name, summary) + suffix)
+
+    def _run(self, name, func, items):
+        concurrency = self.options["concurrency"]
+
+        def call(item):
+            try:
+                return func(item)
+            finally:
+                # Cada hilo del pool abre su propia conexión
+                if concurrency > 1:
+                    close_old_connections()
+
+        self._report(name, time_concurrent(call, items, concurrency))
+
+    def _scenario_register(self):
+        url = reverse("contest:contestants")
+        self.emails = [f"{PREFIX}{self.run_id}-{i}@example.com" for i in range(self.options["requests"])]
+
+        def register(email):
+            response = self._client().post(url, {
+                "first_name": self.rng.choice(FIRST_NAMES), "last_name": self.rng.choice(LAST_NAMES),
+                "email": email, "phone": "+56912345678",
+            }, format="json")
+            return response.status_code == 201
+
+        self._run("inscripción", register, self.emails)
+
+        # Ejecuta (eager, mail locmem) solo los emails encolados por el arnés: el
+        # relay global publicaría también los mensajes reales pendientes
+        messages = list(OutboxMessage.objects.filter(id__in=self._own_outbox_ids()))
+
+        def send(message):
+            return send_verification_email.apply(message.args, message.kwargs).successful()
+
+        self._run("emails de verificación", send, messages)
+
+    def _scenario_verify(self):
+        url = reverse("contest:verification")
+        tokens = EmailVerificationToken.objects.filter(
+            contestant__email__in=self.emails
+        ).values_list("token", flat=True)
+
+        def verify(token):
+            response = self._client().post(url, {
+                "token": str(token), "password": PASSWORD, "password_confirm": PASSWORD,
+            }, format="json")
+            return response.status_code == 200
+
+        self._run("verificación", verify, list(tokens))
+
+    def _scenario_list(self):
+        url = reverse("contest:admin-contestants")
+        page_size = self.options["page_size"]
+        total = Contestant.objects.count()
+        last_page = max((total + page_size - 1) // page_size, 1)
+        pages = [self.rng.randint(max(last_page // 2, 1), last_page) for _ in range(self.options["requests"])]
+
+        def offset_page(page):
+            response = self._client(admin=True).get(url, {"page": page, "page_size": page_size})
+            return response.status_code == 200
+
+        self._run("listado offset profundo", offset_page, pages)
+
+        # Cursores que apuntan a las mismas posiciones profundas
+        ordered = contestant_rows(Contestant.objects.order_by("-created_at", "-id"))
+        offsets = sorted({(page - 1) * page_size for page in pages[:20]}) if total else []
+        cursors = [encode_cursor(ordered[offset], "n") for offset in offsets]
+
+        def cursor_page(cursor):
+            response = self._client(admin=True).get(url, {"cursor": cursor, "page_size": page_size})
+            return response.status_code == 200
+
+        self._run(
+            "listado cursor profundo", cursor_page,
+            [cursors[i % len(cursors)] for i in range(self.options["requests"])] if cursors else [],
+        )
+
+    def _scenario_search(self):
+        url = reverse("contest:admin-contestants")
+        terms = [
+            self.rng.choice((self.rng.choice(LAST_NAMES), f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"))
+            for _ in range(self.options["requests"])
+        ]
+
+        def search(term):
+            response = self._client(admin=True).get(url, {
+                "search": term, "pagination": "cursor", "page_size": self.options["page_size"],
+            })
+            return response.status_code == 200
+
+        self._run("búsqueda", search, terms)
+
+    def _scenario_draw(self):
+        url = reverse("contest:admin-winner")
+        if WinnerDraw.objects.filter(campaign__isnull=True).exists():
+            self.stdout.write(self.style.WARNING("sorteo: ya hay un ganador real, se omite"))
+            return
+
+        samples, errors = [], 0
+        start = time.perf_counter()
+        for _ in range(self.options["draws"]):
+            # Sorteo único: cada uno se revierte (con su email outbox) para medir el
+            # siguiente, sin dejar ganadores ni notificaciones en la base
+            with transaction.atomic():
+                t0 = time.perf_counter()
+                response = self._client(admin=True).post(url)
+                samples.append(time.perf_counter() - t0)
+                errors += response.status_code != 201
+                transaction.set_rollback(True)
+        summary = summarize(samples, time.perf_counter() - start)
+        summary["errors"] = errors
+        self._report("sorteo", summary)
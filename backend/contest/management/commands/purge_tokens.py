@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from contest.cleanup import FROM_SETTINGS, purge_stale_records
+
+
+class Command(BaseCommand):
+    help = "Borra en lotes tokens vencidos/usados, outbox publicado y concursantes sin verificar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--retention-hours", type=int, default=None,
+            help="Horas que se conservan tokens vencidos/usados (por defecto TOKEN_RETENTION_HOURS)",
+        )
+        parser.add_argument(
+            "--unverified-days", type=int, default=None,
+            help="Borra concursantes sin verificar con más de N días (0 = no borrar; por defecto UNVERIFIED_CONTESTANT_MAX_AGE_DAYS)",
+        )
+        parser.add_argument("--pause", type=float, default=0, help="Segundos entre lotes")
+
+    def handle(self, *args, **options):
+        retention = options["retention_hours"]
+        unverified_days = options["unverified_days"]
+        result = purge_stale_records(
+            batch_size=options["batch_size"],
+            retention=None if retention is None else timedelta(hours=retention),
+            unverified_max_age=FROM_SETTINGS if unverified_days is None else timedelta(days=unverified_days),
+            pause=options["pause"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Borrados {result['tokens']} tokens, {result['outbox']} mensajes outbox "
+            f"y {result['contestants']} concursantes sin verificar"
+        ))
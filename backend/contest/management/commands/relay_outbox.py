@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from contest.outbox import relay_outbox
+
+
+class Command(BaseCommand):
+    help = "Publica al broker las tareas pendientes del outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Quedarse corriendo y publicar cada OUTBOX_RELAY_INTERVAL segundos",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = relay_outbox(batch_size=options["batch_size"])
+            if published or not options["loop"]:
+                self.stdout.write(f"Publicados {published} mensajes")
+            if not options["loop"]:
+                break
+            time.sleep(settings.OUTBOX_RELAY_INTERVAL)
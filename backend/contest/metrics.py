@@ -0,0 +1,354 @@
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from .caching import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics"
+# Buckets de latencia en segundos (estilo Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Las sumas se guardan como enteros (microsegundos) para usar incr
+MICROS = 1_000_000
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _redis_client():
+    """Cliente redis-py del cache por defecto, o None si el backend no es Redis"""
+    return redis_client(caches["default"])
+
+
+def _incr(*increments):
+    """
+    Suma cada (clave, cantidad) en el cache.
+
+    En Redis va un solo pipeline de INCRBY (un round-trip, y INCRBY crea la
+    clave si no existe); el incr de Django haría EXISTS + INCR por clave. En
+    otros backends se intenta incr y solo si la clave no existe se hace add.
+    """
+    try:
+        client = _redis_client()
+        if client is not None:
+            pipe = client.pipeline(transaction=False)
+            for key, amount in increments:
+                pipe.incrby(cache.make_and_validate_key(key), amount)
+            pipe.execute()
+            return
+        for key, amount in increments:
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                if not cache.add(key, amount, None):
+                    cache.incr(key, amount)
+    except Exception as exc:
+        # Las métricas nunca rompen la request o la tarea; en debug para no
+        # inundar el log en cada request mientras el cache no responde
+        logger.debug("Métricas: no se pudo incrementar %s: %s", [key for key, _ in increments], exc)
+
+
+class Metric:
+    """
+    Métrica del registro local. Los valores viven en el cache (Redis), así que
+    se suman entre procesos web y workers de Celery sin un servicio externo.
+
+    label_values es un callable que devuelve las combinaciones de labels a
+    exportar (el cache no permite listar claves).
+    """
+
+    type = None
+
+    def __init__(self, name, help_text, labelnames=(), label_values=None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.label_values = label_values or (lambda: [()])
+        REGISTRY[name] = self
+
+    def _key(self, labels, suffix):
+        return ":".join((KEY_PREFIX, self.name, *map(str, labels), suffix))
+
+    def _labels(self, labels):
+        values = tuple(labels.get(name, "") for name in self.labelnames)
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera los labels {self.labelnames}")
+        return values
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount > 0:
+            _incr((self._key(self._labels(labels), "value"), amount))
+
+    async def ainc(self, amount=1, **labels):
+        """inc() desde código async: el cliente de cache es sync, va en un hilo"""
+        await sync_to_async(self.inc, thread_sensitive=False)(amount, **labels)
+
+    def keys(self, labels):
+        return [self._key(labels, "value")]
+
+    def render(self, labels, values):
+        value = values.get(self._key(labels, "value"), 0)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), label_values=None, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames, label_values)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, **labels):
+        # Se incrementa solo el bucket de la observación; los acumulados se
+        # calculan al exportar (3 claves por observación, en un solo pipeline)
+        values = self._labels(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        _incr(
+            (self._key(values, f"b{index}"), 1),
+            (self._key(values, "sum"), int(seconds * MICROS)),
+            (self._key(values, "count"), 1),
+        )
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def keys(self, labels):
+        return [self._key(labels, f"b{i}") for i in range(len(self.buckets) + 1)] + [
+            self._key(labels, "sum"), self._key(labels, "count"),
+        ]
+
+    def render(self, labels, values):
+        lines = []
+        cumulative = 0
+        for i, bound in enumerate((*self.buckets, "+Inf")):
+            cumulative += values.get(self._key(labels, f"b{i}"), 0)
+            le = bound if bound == "+Inf" else repr(float(bound))
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+        total = values.get(self._key(labels, "sum"), 0) / MICROS
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+        lines.append(
+            f"{self.name}_count{_format_labels(self.labelnames, labels)} "
+            f"{values.get(self._key(labels, 'count'), 0)}"
+        )
+        return lines
+
+
+class Gauge(Metric):
+    """Valor calculado al exportar (ej. largo de una cola); no se guarda en el cache"""
+
+    type = "gauge"
+
+    def __init__(self, name, help_text, collect, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def keys(self, labels):
+        return []
+
+    def render(self, labels, values):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, label_set)} {value}"
+            for label_set, value in self.collect()
+        ]
+
+
+REGISTRY = {}
+
+
+def render_metrics():
+    """
+    Exporta todo el registro en formato de texto de Prometheus, con un solo get_many.
+
+    Returns:
+        str: Cuerpo para el endpoint /metrics
+    """
+    series = [
+        (metric, labels)
+        for metric in REGISTRY.values()
+        for labels in (metric.label_values() if metric.type != "gauge" else [()])
+    ]
+    keys = [key for metric, labels in series for key in metric.keys(labels)]
+    try:
+        values = cache.get_many(keys) if keys else {}
+    except Exception as exc:
+        logger.warning("Métricas: cache no disponible: %s", exc)
+        values = {}
+
+    lines = []
+    current = None
+    for metric, labels in series:
+        if metric is not current:
+            current = metric
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+        try:
+            lines.extend(metric.render(labels, values))
+        except Exception as exc:
+            logger.warning("Métricas: no se pudo calcular %s: %s", metric.name, exc)
+    return "\n".join(lines) + "\n"
+
+
+# Series a exportar
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_names():
+    """Nombres de las rutas de la API (sin el admin de Django) y la de requests sin ruta"""
+    from django.urls import URLPattern, URLResolver, get_resolver
+
+    names = []
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace != "admin":
+                    walk(pattern.url_patterns, ":".join(filter(None, (namespace, pattern.namespace))))
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.append(":".join(filter(None, (namespace, pattern.name))))
+
+    walk(get_resolver().url_patterns, "")
+    return [(name,) for name in names + [UNMATCHED_ROUTE]]
+
+
+def _task_names():
+    from celery import current_app
+
+    return sorted(name for name in current_app.tasks if name.startswith("contest."))
+
+
+def _queue_names():
+    from celery import current_app
+
+    conf = current_app.conf
+    names = [queue.name for queue in (conf.task_queues or [])]
+    return names or [conf.task_default_queue]
+
+
+def _broker_queue_lengths():
+    url = settings.CELERY_BROKER_URL
+    if not url.startswith(("redis://", "rediss://")):
+        return []
+    import redis
+
+    client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    pipe = client.pipeline(transaction=False)
+    names = _queue_names()
+    for name in names:
+        pipe.llen(name)
+    return [((name,), length) for name, length in zip(names, pipe.execute())]
+
+
+def _outbox_pending():
+    from .models import OutboxMessage
+
+    return [((), OutboxMessage.objects.filter(published_at__isnull=True, failed_at__isnull=True).count())]
+
+
+def _outbox_failed():
+    from .models import OutboxMessage
+
+    return [((), OutboxMessage.objects.filter(failed_at__isnull=False).count())]
+
+
+def _verification_emails_pending():
+    from .models import EmailVerificationToken
+
+    # Mismo filtro que el índice parcial token_unsent
+    return [((), EmailVerificationToken.objects.filter(sent_at__isnull=True, used_at__isnull=True).count())]
+
+
+REQUEST_SECONDS = Histogram(
+    "contest_http_request_duration_seconds", "Latencia de las requests por ruta",
+    ["route"], _route_names,
+)
+REGISTRATIONS = Counter("contest_registrations_total", "Concursantes inscritos")
+VERIFICATIONS = Counter("contest_verifications_total", "Concursantes verificados")
+DRAWS = Counter(
+    "contest_draws_total", "Sorteos realizados", ["kind"],
+    lambda: [("single",), ("campaign",)],
+)
+TOKEN_FAILURES = Counter(
+    "contest_token_failures_total", "Verificaciones rechazadas por token", ["reason"],
+    lambda: [("invalid",), ("expired",)],
+)
+TASK_SECONDS = Histogram(
+    "contest_celery_task_duration_seconds", "Duración de las tareas de Celery",
+    ["task"], lambda: [(name,) for name in _task_names()],
+)
+TASKS = Counter(
+    "contest_celery_tasks_total", "Tareas de Celery terminadas por estado", ["task", "state"],
+    lambda: [(name, state) for name in _task_names() for state in ("SUCCESS", "FAILURE", "RETRY")],
+)
+SMTP_SECONDS = Histogram(
+    "contest_smtp_send_seconds", "Tiempo de envío SMTP por email (individual o del envío por lotes)", ["kind"],
+    lambda: [("single",), ("batch",)],
+)
+Gauge("contest_broker_queue_length", "Mensajes esperando en la cola del broker", _broker_queue_lengths, ["queue"])
+Gauge("contest_outbox_pending", "Mensajes del outbox sin publicar", _outbox_pending)
+Gauge("contest_outbox_failed", "Mensajes del outbox descartados tras agotar los intentos", _outbox_failed)
+Gauge(
+    "contest_verification_emails_pending", "Emails de verificación sin enviar (modo por lotes)",
+    _verification_emails_pending,
+)
+
+
+class MetricsMiddleware:
+    """
+    Registra la latencia de cada request en REQUEST_SECONDS, por nombre de ruta.
+
+    Es sync y async, así que bajo ASGI no obliga a correr la cadena en un hilo.
+    En modo async la escritura al cache va en un hilo aparte, para que un
+    Redis lento no bloquee el event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        t0 = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, time.perf_counter() - t0)
+        return response
+
+    async def __acall__(self, request):
+        t0 = time.perf_counter()
+        response = await self.get_response(request)
+        await sync_to_async(self._observe, thread_sensitive=False)(request, time.perf_counter() - t0)
+        return response
+
+    def _observe(self, request, elapsed):
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match is not None and match.url_name else UNMATCHED_ROUTE
+        # El admin de Django no se mide (sus rutas no se exportan)
+        if match is None or match.namespace != "admin":
+            REQUEST_SECONDS.observe(elapsed, route=route)
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+from contest.utils import build_contestant_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Contestant = apps.get_model('contest', 'Contestant')
+    batch = []
+    for c in Contestant.objects.only(
+        'id', 'first_name', 'last_name', 'second_last_name', 'email'
+    ).iterator(chunk_size=2000):
+        c.search_text = build_contestant_search_text(
+            c.first_name, c.last_name, c.second_last_name, c.email
+        )
+        batch.append(c)
+        if len(batch) >= 2000:
+            Contestant.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Contestant.objects.bulk_update(batch, ['search_text'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Índice GIN trigram solo en Postgres: acelera LIKE '%texto%'
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS contestant_search_trgm '
+        'ON contest_contestant USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS contestant_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contestant',
+            name='search_text',
+            field=models.CharField(blank=True, editable=False, max_length=400),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0002_contestant_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contestant',
+            index=models.Index(fields=['-created_at', '-id'], name='contestant_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='contestant',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['-created_at', '-id'], name='contestant_verified_created'),
+        ),
+        migrations.AddIndex(
+            model_name='contestant',
+            index=models.Index(condition=models.Q(('is_verified', False)), fields=['-created_at', '-id'], name='contestant_pending_created'),
+        ),
+        migrations.AddIndex(
+            model_name='contestant',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['id'], name='contestant_eligible_id'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(condition=models.Q(('used_at__isnull', True)), fields=['contestant', '-created_at'], name='token_pending_by_contestant'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(fields=['expires_at'], name='token_expires_at'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0004_winnerdraw_seed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, verbose_name='Nombre')),
+                ('slug', models.SlugField(unique=True)),
+                ('winners_count', models.PositiveIntegerField(default=1, verbose_name='Ganadores')),
+                ('alternates_count', models.PositiveIntegerField(default=0, verbose_name='Suplentes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Campaña',
+                'verbose_name_plural': 'Campañas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='winnerdraw',
+            name='is_alternate',
+            field=models.BooleanField(default=False, verbose_name='Suplente'),
+        ),
+        migrations.AddField(
+            model_name='winnerdraw',
+            name='position',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='winnerdraw',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='draws', to='contest.campaign'),
+        ),
+        migrations.AddConstraint(
+            model_name='winnerdraw',
+            constraint=models.UniqueConstraint(fields=('campaign', 'contestant'), name='winnerdraw_unique_contestant'),
+        ),
+        migrations.AddConstraint(
+            model_name='winnerdraw',
+            constraint=models.UniqueConstraint(fields=('campaign', 'position'), name='winnerdraw_unique_position'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+def mark_existing_tokens_sent(apps, schema_editor):
+    # Los tokens previos ya tuvieron su envío individual: no deben re-enviarse
+    EmailVerificationToken = apps.get_model('contest', 'EmailVerificationToken')
+    EmailVerificationToken.objects.update(sent_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0005_campaigns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailverificationtoken',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True), ('used_at__isnull', True)), fields=['id'], name='token_unsent'),
+        ),
+        migrations.RunPython(mark_existing_tokens_sent, migrations.RunPython.noop),
+    ]
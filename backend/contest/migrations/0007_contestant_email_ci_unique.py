@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:44
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0006_token_sent_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='contestant',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='contestant_email_ci_unique'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+def backfill_verified_at(apps, schema_editor):
+    # Fecha de verificación = uso del primer token; si no queda token, la inscripción
+    Contestant = apps.get_model('contest', 'Contestant')
+    EmailVerificationToken = apps.get_model('contest', 'EmailVerificationToken')
+    first_use = EmailVerificationToken.objects.filter(
+        contestant=models.OuterRef('pk'), used_at__isnull=False
+    ).order_by('used_at').values('used_at')[:1]
+    Contestant.objects.filter(is_verified=True).update(
+        verified_at=models.functions.Coalesce(models.Subquery(first_use), models.F('created_at'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0008_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contestant',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_verified_at, migrations.RunPython.noop),
+    ]
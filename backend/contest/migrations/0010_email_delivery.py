@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0009_contestant_verified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('verification', 'Verificación'), ('winner', 'Ganador')], max_length=20, verbose_name='Tipo')),
+                ('reference', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('sent', 'Enviado'), ('retrying', 'Reintentando'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('contestant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='contest.contestant')),
+            ],
+            options={
+                'verbose_name': 'Envío de email',
+                'verbose_name_plural': 'Envíos de email',
+                'indexes': [models.Index(fields=['status', 'kind', '-updated_at'], name='delivery_status_kind'), models.Index(fields=['-updated_at'], name='delivery_updated')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='emaildelivery',
+            constraint=models.UniqueConstraint(fields=('kind', 'contestant', 'reference'), name='delivery_unique_message'),
+        ),
+    ]
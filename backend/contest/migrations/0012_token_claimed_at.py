@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contest', '0011_outbox_retry_backoff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailverificationtoken',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
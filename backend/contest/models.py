@@ -1,17 +1,22 @@
 import uuid
 from datetime import timedelta
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.utils import timezone
 
+from .utils import build_contestant_search_text
+
 phone_validator = RegexValidator(
     regex=r'^\+?[1-9]\d{7,14}$',
     message="Ingrese un teléfono válido en formato internacional (E.164), ej: +56912345678."
 )
 
+TOKEN_EXPIRY = timedelta(hours=2)
+
 def default_token_expiry():
-    return timezone.now() + timedelta(hours=2)
+    return timezone.now() + TOKEN_EXPIRY
 
 class Contestant(models.Model):
     first_name = models.CharField("Nombre(s)", max_length=50)
@@ -20,8 +25,13 @@ class Contestant(models.Model):
     email = models.EmailField(unique=True)  # ← MANTÉN unique=True
     phone = models.CharField(max_length=16, validators=[phone_validator])
     is_verified = models.BooleanField(default=False)
+    verified_at = models.DateTimeField(null=True, blank=True)
     user = models.OneToOneField(User, null=True, blank=True, on_delete=models.SET_NULL)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Nombres + email sin tildes ni mayúsculas, para búsquedas indexadas
+    search_text = models.CharField(max_length=400, blank=True, editable=False)
+
+    SEARCH_SOURCE_FIELDS = ("first_name", "last_name", "second_last_name", "email")
 
     @property
     def full_name(self):
@@ -32,11 +42,44 @@ class Contestant(models.Model):
 
     def __str__(self):
         return f"{self.full_name} <{self.email}>"
-        
+
+    def refresh_search_text(self):
+        self.search_text = build_contestant_search_text(
+            self.first_name, self.last_name, self.second_last_name, self.email
+        )
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.SEARCH_SOURCE_FIELDS):
+            kwargs["update_fields"] = {*update_fields, "search_text"}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Concursante"
         verbose_name_plural = "Concursantes"
+        constraints = [
+            # Duplicados sin distinguir mayúsculas los rechaza la base, sin pre-consulta
+            models.UniqueConstraint(Lower("email"), name="contestant_email_ci_unique"),
+        ]
+        indexes = [
+            # Listado admin sin filtro y paginación por cursor
+            models.Index(fields=["-created_at", "-id"], name="contestant_created_id"),
+            # Listado admin filtrado por ?verified= y ordenado por fecha. Parciales
+            # porque SQLite compila is_verified=True como "WHERE is_verified" y no
+            # usaría un índice compuesto (is_verified, created_at).
+            models.Index(
+                fields=["-created_at", "-id"], condition=models.Q(is_verified=True),
+                name="contestant_verified_created",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"], condition=models.Q(is_verified=False),
+                name="contestant_pending_created",
+            ),
+            # Sorteo: solo concursantes verificados
+            models.Index(fields=["id"], condition=models.Q(is_verified=True), name="contestant_eligible_id"),
+        ]
 
 class EmailVerificationToken(models.Model):
     contestant = models.ForeignKey(Contestant, on_delete=models.CASCADE, related_name="tokens")
@@ -44,6 +87,30 @@ class EmailVerificationToken(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(default=default_token_expiry)
     used_at = models.DateTimeField(null=True, blank=True)
+    # Cuándo se encoló el envío individual o se envió en el drenado por lotes
+    # (en importaciones sin envío, cuándo se creó). NULL = pendiente del
+    # drenado por lotes (send_pending_verification_emails)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Cuándo un drenado por lotes tomó el token; la toma vence tras
+    # VERIFICATION_EMAIL_CLAIM_TIMEOUT si el envío no llegó a marcar sent_at
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Cola de emails de verificación pendientes de envío por lotes
+            models.Index(
+                fields=["id"], condition=models.Q(sent_at__isnull=True, used_at__isnull=True),
+                name="token_unsent",
+            ),
+            # Último token vigente (used_at IS NULL) de un concursante. La búsqueda
+            # por token en validate_token ya usa el índice único de token.
+            models.Index(
+                fields=["contestant", "-created_at"], condition=models.Q(used_at__isnull=True),
+                name="token_pending_by_contestant",
+            ),
+            # Expiración / limpieza de tokens
+            models.Index(fields=["expires_at"], name="token_expires_at"),
+        ]
 
     def is_expired(self):
         return timezone.now() > self.expires_at
@@ -51,9 +118,123 @@ class EmailVerificationToken(models.Model):
     def __str__(self):
         return f"Token {self.token} for {self.contestant.email}"
 
+class Campaign(models.Model):
+    """Concurso/campaña con su propio sorteo de ganadores y suplentes"""
+    name = models.CharField("Nombre", max_length=120)
+    slug = models.SlugField(unique=True)
+    winners_count = models.PositiveIntegerField("Ganadores", default=1)
+    alternates_count = models.PositiveIntegerField("Suplentes", default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Campaña"
+        verbose_name_plural = "Campañas"
+
+    def __str__(self):
+        return self.name
+
+
 class WinnerDraw(models.Model):
+    # Sorteos sin campaña corresponden al sorteo único original
+    campaign = models.ForeignKey(
+        Campaign, null=True, blank=True, on_delete=models.CASCADE, related_name="draws"
+    )
     contestant = models.ForeignKey(Contestant, on_delete=models.CASCADE)
+    # Orden de salida dentro de la campaña (1 = primer ganador)
+    position = models.PositiveIntegerField(default=1)
+    is_alternate = models.BooleanField("Suplente", default=False)
     drawn_at = models.DateTimeField(auto_now_add=True)
+    # Semilla del generador usado en el sorteo, para reproducirlo/auditarlo
+    seed = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "contestant"], name="winnerdraw_unique_contestant"),
+            models.UniqueConstraint(fields=["campaign", "position"], name="winnerdraw_unique_position"),
+        ]
 
     def __str__(self):
         return f"{self.contestant.email} @ {self.drawn_at}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Tarea de Celery pendiente de publicar (patrón transactional outbox).
+
+    Se escribe en la misma transacción que el cambio que la origina, y
+    contest.outbox.relay_outbox la publica al broker después. Un mensaje que
+    no se puede publicar se reintenta con backoff (available_at) hasta
+    OUTBOX_MAX_ATTEMPTS y luego queda marcado con failed_at.
+    """
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Desde cuándo el relay puede volver a tomarlo (backoff entre intentos)
+    available_at = models.DateTimeField(default=timezone.now)
+    # Agotó OUTBOX_MAX_ATTEMPTS: el relay ya no lo toma
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Mensaje outbox"
+        verbose_name_plural = "Mensajes outbox"
+        indexes = [
+            models.Index(
+                fields=["id"], condition=models.Q(published_at__isnull=True, failed_at__isnull=True),
+                name="outbox_pending",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.pk}"
+
+
+class EmailDelivery(models.Model):
+    """
+    Estado de cada email enviado por las tareas (uno por mensaje).
+
+    Las tareas escriben el resultado de cada intento con un upsert por lote
+    (contest.deliveries), sin una escritura por cambio de estado.
+    """
+    VERIFICATION = "verification"
+    WINNER = "winner"
+    KIND_CHOICES = [(VERIFICATION, "Verificación"), (WINNER, "Ganador")]
+
+    PENDING = "pending"
+    SENT = "sent"
+    RETRYING = "retrying"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"), (SENT, "Enviado"), (RETRYING, "Reintentando"), (FAILED, "Fallido"),
+    ]
+
+    kind = models.CharField("Tipo", max_length=20, choices=KIND_CHOICES)
+    contestant = models.ForeignKey(Contestant, on_delete=models.CASCADE, related_name="deliveries")
+    # Identifica el mensaje dentro del tipo: el token en verificación, vacío para el ganador
+    reference = models.CharField(max_length=64, blank=True)
+    status = models.CharField("Estado", max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField("Intentos", default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Envío de email"
+        verbose_name_plural = "Envíos de email"
+        constraints = [
+            # Clave del upsert de las tareas
+            models.UniqueConstraint(fields=["kind", "contestant", "reference"], name="delivery_unique_message"),
+        ]
+        indexes = [
+            # Filtros del admin: estado + tipo, más recientes primero
+            models.Index(fields=["status", "kind", "-updated_at"], name="delivery_status_kind"),
+            models.Index(fields=["-updated_at"], name="delivery_updated"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} a {self.contestant_id}: {self.status}"
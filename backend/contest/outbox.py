@@ -0,0 +1,137 @@
+import logging
+from contextlib import nullcontext
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .instrumentation import timed_function
+from .models import OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+@timed_function("enqueue")
+def enqueue(task, *args, **kwargs):
+    """
+    Registra una tarea en el outbox, dentro de la transacción en curso.
+
+    Args:
+        task: Tarea de Celery (se guarda su nombre)
+        *args, **kwargs: Argumentos serializables a JSON
+
+    Returns:
+        OutboxMessage: Fila creada
+    """
+    return OutboxMessage.objects.create(task_name=task.name, args=list(args), kwargs=kwargs)
+
+
+@timed_function("enqueue")
+def enqueue_many(task, args_list):
+    """Registra varias llamadas a la misma tarea con un solo INSERT"""
+    return OutboxMessage.objects.bulk_create(
+        [OutboxMessage(task_name=task.name, args=list(args)) for args in args_list]
+    )
+
+
+def _publish(message, producer):
+    task = current_app.tasks.get(message.task_name)
+    if task is not None:
+        # apply_async respeta CELERY_TASK_ALWAYS_EAGER y el routing de la tarea
+        task.apply_async(message.args, message.kwargs, producer=producer)
+    else:
+        current_app.send_task(message.task_name, message.args, message.kwargs, producer=producer)
+
+
+def _producer():
+    # En modo eager no hay broker: no se abre conexión
+    if current_app.conf.task_always_eager:
+        return nullcontext(None)
+    return current_app.producer_or_acquire()
+
+
+def _retry_delay(attempts):
+    """Backoff exponencial entre intentos de publicación, con tope"""
+    seconds = settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.OUTBOX_RETRY_BACKOFF_MAX))
+
+
+def _record_failures(failures):
+    """
+    Guarda el error de los mensajes que no se pudieron publicar.
+
+    Cada uno vuelve a estar disponible tras un backoff exponencial; al llegar
+    a OUTBOX_MAX_ATTEMPTS queda con failed_at y el relay deja de tomarlo.
+    """
+    now = timezone.now()
+    for message, error in failures:
+        message.attempts += 1
+        message.last_error = str(error)[:1000]
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            message.failed_at = now
+            logger.error("Outbox: %s descartado tras %s intentos: %s", message, message.attempts, error)
+        else:
+            message.available_at = now + _retry_delay(message.attempts)
+            logger.warning("Outbox: error publicando %s: %s", message, error)
+    OutboxMessage.objects.bulk_update(
+        [message for message, _ in failures], ["attempts", "last_error", "available_at", "failed_at"]
+    )
+
+
+def relay_outbox(batch_size=None, max_batches=None):
+    """
+    Publica al broker los mensajes pendientes del outbox, por lotes.
+
+    Cada lote se toma con SELECT ... FOR UPDATE SKIP LOCKED (en Postgres),
+    se publica reutilizando una conexión al broker y se marca con un solo
+    UPDATE. Un mensaje que falla no frena al resto del lote: se reintenta con
+    backoff en una pasada posterior y, tras OUTBOX_MAX_ATTEMPTS, se marca como
+    fallido y sale de la cola.
+
+    Args:
+        batch_size (int): Mensajes por lote (por defecto OUTBOX_RELAY_BATCH_SIZE)
+        max_batches (int): Tope de lotes por llamada (None = hasta vaciar)
+
+    Returns:
+        int: Mensajes publicados
+    """
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    published = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batches += 1
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects
+                .select_for_update(skip_locked=True)
+                .filter(published_at__isnull=True, failed_at__isnull=True, available_at__lte=timezone.now())
+                .order_by("id")[:batch_size]
+            )
+            if not messages:
+                break
+
+            done, failures = [], []
+            try:
+                with _producer() as producer:
+                    for message in messages:
+                        try:
+                            _publish(message, producer)
+                        except Exception as exc:
+                            failures.append((message, exc))
+                        else:
+                            done.append(message.id)
+            except Exception as exc:
+                # Sin conexión al broker: lo que no se alcanzó a publicar cuenta como intento fallido
+                handled = set(done) | {message.id for message, _ in failures}
+                failures.extend((message, exc) for message in messages if message.id not in handled)
+
+            OutboxMessage.objects.filter(id__in=done).update(
+                published_at=timezone.now(), last_error=""
+            )
+            published += len(done)
+            if failures:
+                _record_failures(failures)
+    return published
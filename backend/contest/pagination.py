@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+COUNT_MODES = ("exact", "approx", "none")
+
+
+def encode_cursor(contestant, direction):
+    """
+    Codifica la posición (created_at, id) de un concursante como cursor opaco.
+
+    Args:
+        contestant (Contestant | dict): Fila que marca el borde de la página
+            (instancia o fila de .values())
+        direction (str): 'n' para avanzar, 'p' para retroceder
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    if isinstance(contestant, dict):
+        created_at, contestant_id = contestant["created_at"], contestant["id"]
+    else:
+        created_at, contestant_id = contestant.created_at, contestant.id
+    payload = json.dumps({
+        "c": created_at.isoformat(),
+        "i": contestant_id,
+        "d": direction,
+    }, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Returns:
+        tuple: (created_at, id, direction) o None si el cursor es inválido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(payload["c"])
+        contestant_id = int(payload["i"])
+        direction = payload["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+    if created_at is None or direction not in ("n", "p"):
+        return None
+    return created_at, contestant_id, direction
+
+
+def paginate_by_cursor(queryset, cursor, page_size):
+    """
+    Paginación keyset sobre (-created_at, -id).
+
+    Cada página es un range scan acotado sobre el índice, sin OFFSET, así que
+    el costo no depende de la profundidad de la página.
+
+    Returns:
+        tuple: (filas, cursor_next, cursor_prev)
+    """
+    direction = "n"
+    if cursor:
+        created_at, contestant_id, direction = cursor
+        if direction == "n":
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=contestant_id)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=contestant_id)
+            )
+
+    if direction == "n":
+        rows = list(queryset.order_by("-created_at", "-id")[:page_size + 1])
+    else:
+        rows = list(queryset.order_by("created_at", "id")[:page_size + 1])
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "p":
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    if direction == "n":
+        next_cursor = encode_cursor(rows[-1], "n") if has_more else None
+        prev_cursor = encode_cursor(rows[0], "p") if cursor else None
+    else:
+        next_cursor = encode_cursor(rows[-1], "n")
+        prev_cursor = encode_cursor(rows[0], "p") if has_more else None
+    return rows, next_cursor, prev_cursor
+
+
+def count_queryset(queryset, mode, filtered):
+    """
+    Cuenta filas según el modo pedido.
+
+    - exact: COUNT(*) completo.
+    - approx: estimación del planner en Postgres si no hay filtros; si no,
+      COUNT(*) acotado a CONTEST_COUNT_CAP filas.
+    - none: no cuenta.
+
+    Returns:
+        tuple: (count, is_estimate)
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return queryset.count(), False
+
+    if not filtered and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0], True
+
+    cap = settings.CONTEST_COUNT_CAP
+    total = queryset.order_by()[:cap + 1].count()
+    if total > cap:
+        return cap, True
+    return total, False
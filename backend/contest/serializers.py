@@ -2,29 +2,57 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.utils import timezone
-from django.db.models.functions import Lower
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
-from .models import Contestant, EmailVerificationToken, WinnerDraw
+from . import hashing, metrics, outbox, stats
+from .instrumentation import TimedSerializerMixin
+from .models import Campaign, Contestant, EmailVerificationToken, WinnerDraw
+from .tasks import send_verification_email
 from .utils import normalize_contestant_fields
 
 
-class ContestantRegistrationSerializer(serializers.ModelSerializer):
-    """Registro inicial de concursantes"""
+class ContestantRegistrationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Registro inicial de concursantes.
+
+    No consulta si el email existe: el insert se apoya en los índices únicos
+    (email y lower(email)) y un IntegrityError se traduce al error de
+    validación de siempre. Concursante, token y el mensaje outbox del email de
+    verificación se escriben en una sola transacción.
+    """
+
+    DUPLICATE_EMAIL_ERROR = "Este correo ya está inscrito en el concurso."
 
     class Meta:
         model = Contestant
         fields = ["first_name", "last_name", "second_last_name", "email", "phone"]
+        # Sin UniqueValidator: evita un SELECT por inscripción
+        extra_kwargs = {"email": {"validators": []}}
 
     def validate(self, attrs):
         return normalize_contestant_fields(attrs)
 
-    def validate_email(self, value):
-        if Contestant.objects.filter(email__iexact=value.strip()).exists():
-            raise serializers.ValidationError("Este correo ya está inscrito en el concurso.")
-        return value
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                contestant = Contestant.objects.create(**validated_data)
+                # En modo por lotes el envío lo hace send_pending_verification_emails;
+                # si no, sent_at marca el envío individual como ya encolado para
+                # que el drenado por lotes no lo tome también.
+                batching = settings.VERIFICATION_EMAIL_BATCHING
+                token = EmailVerificationToken.objects.create(
+                    contestant=contestant, sent_at=None if batching else timezone.now()
+                )
+                stats.record_registrations()
+                if not batching:
+                    outbox.enqueue(send_verification_email, contestant.id, str(token.token))
+        except IntegrityError:
+            raise serializers.ValidationError({"email": [self.DUPLICATE_EMAIL_ERROR]})
+        return contestant
 
 
-class ContestantSerializer(serializers.ModelSerializer):
+class ContestantSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
 
     class Meta:
@@ -36,11 +64,14 @@ class ContestantSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "is_verified", "created_at"]
 
 
-class EmailVerificationSerializer(serializers.Serializer):
+class EmailVerificationSerializer(TimedSerializerMixin, serializers.Serializer):
     """
     Verifica token y setea contraseña en un solo paso.
     Si prefieres 2 pasos, separa en VerifyTokenSerializer y SetPasswordSerializer.
     """
+    TOKEN_INVALID_ERROR = "Token de verificación inválido."
+    TOKEN_EXPIRED_ERROR = "El token de verificación ha expirado."
+
     token = serializers.UUIDField()
     password = serializers.CharField(write_only=True, min_length=8, trim_whitespace=False)
     password_confirm = serializers.CharField(write_only=True, min_length=8, trim_whitespace=False)
@@ -57,9 +88,11 @@ class EmailVerificationSerializer(serializers.Serializer):
                 token=value, used_at__isnull=True
             )
         except EmailVerificationToken.DoesNotExist:
-            raise serializers.ValidationError("Token de verificación inválido.")
+            metrics.TOKEN_FAILURES.inc(reason="invalid")
+            raise serializers.ValidationError(self.TOKEN_INVALID_ERROR)
         if token_obj.is_expired():
-            raise serializers.ValidationError("El token de verificación ha expirado.")
+            metrics.TOKEN_FAILURES.inc(reason="expired")
+            raise serializers.ValidationError(self.TOKEN_EXPIRED_ERROR)
         return token_obj  
     
     def create(self, validated_data):
@@ -69,13 +102,32 @@ class EmailVerificationSerializer(serializers.Serializer):
         - crear/vincular User con password
         - marcar token.used_at
         """
-        token_obj: EmailVerificationToken = validated_data["token"]
+        # El hash (lo más caro) se calcula antes de abrir la transacción
+        encoded_password = hashing.hash_password(validated_data["password"])
+        return self.activate(validated_data["token"], encoded_password)
+
+    @staticmethod
+    @transaction.atomic
+    def activate(token_obj, encoded_password):
+        """
+        Escrituras de la verificación, en una transacción. La comparten la view
+        sync y la async (que hashea la contraseña fuera del hilo de la base).
+
+        Args:
+            token_obj (EmailVerificationToken): Token válido, con su concursante
+            encoded_password (str): Contraseña ya hasheada
+
+        Returns:
+            Contestant: Concursante verificado
+        """
         contestant = token_obj.contestant
 
         # Verifica concursante
         if not contestant.is_verified:
             contestant.is_verified = True
-            contestant.save(update_fields=["is_verified"])
+            contestant.verified_at = timezone.now()
+            contestant.save(update_fields=["is_verified", "verified_at"])
+            stats.record_verifications()
 
         # Crea o vincula User y setea password
         if not contestant.user:
@@ -92,7 +144,7 @@ class EmailVerificationSerializer(serializers.Serializer):
         else:
             user = contestant.user
 
-        user.set_password(validated_data["password"])
+        user.password = encoded_password
         user.save()
         if contestant.user_id != user.id:
             contestant.user = user
@@ -104,7 +156,53 @@ class EmailVerificationSerializer(serializers.Serializer):
 
         return contestant 
 
-class EmailVerificationTokenSerializer(serializers.ModelSerializer):
+class ResendVerificationSerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    Reenvía el email de verificación de un concursante no verificado.
+
+    Reutiliza el último token vigente si le queda al menos
+    RESEND_TOKEN_MIN_LIFETIME (si no, crea uno nuevo), y encola el envío por
+    el outbox. Si el email no existe o ya está verificado no hace nada (la
+    view responde igual en ambos casos para no revelar inscritos).
+    """
+    email = serializers.EmailField()
+
+    def validate_email(self, value):
+        return value.strip().lower()
+
+    def resend(self):
+        """
+        Returns:
+            EmailVerificationToken | None: Token enviado, o None si no corresponde enviar
+        """
+        contestant = Contestant.objects.filter(
+            email=self.validated_data["email"], is_verified=False
+        ).first()
+        if contestant is None:
+            return None
+
+        with transaction.atomic():
+            token = (
+                EmailVerificationToken.objects
+                .filter(
+                    contestant=contestant, used_at__isnull=True,
+                    expires_at__gt=timezone.now() + settings.RESEND_TOKEN_MIN_LIFETIME,
+                )
+                .order_by("-created_at")
+                .first()
+            )
+            if token is None:
+                token = EmailVerificationToken.objects.create(contestant=contestant)
+            if settings.VERIFICATION_EMAIL_BATCHING:
+                # Vuelve a la cola del envío por lotes
+                EmailVerificationToken.objects.filter(pk=token.pk).update(sent_at=None)
+            else:
+                EmailVerificationToken.objects.filter(pk=token.pk).update(sent_at=timezone.now())
+                outbox.enqueue(send_verification_email, contestant.id, str(token.token))
+        return token
+
+
+class EmailVerificationTokenSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     contestant_name = serializers.CharField(source="contestant.full_name", read_only=True)
     contestant_email = serializers.CharField(source="contestant.email", read_only=True)
     is_expired = serializers.SerializerMethodField()
@@ -121,18 +219,33 @@ class EmailVerificationTokenSerializer(serializers.ModelSerializer):
         return obj.is_expired()
 
 
-class WinnerDrawSerializer(serializers.ModelSerializer):
+class WinnerDrawSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     contestant_name = serializers.CharField(source="contestant.full_name", read_only=True)
     contestant_email = serializers.CharField(source="contestant.email", read_only=True)
     contestant_phone = serializers.CharField(source="contestant.phone", read_only=True)
 
     class Meta:
         model = WinnerDraw
-        fields = ["id", "contestant", "contestant_name", "contestant_email", "contestant_phone", "drawn_at"]
-        read_only_fields = ["drawn_at"]
+        fields = [
+            "id", "campaign", "contestant", "contestant_name", "contestant_email", "contestant_phone",
+            "position", "is_alternate", "drawn_at", "seed",
+        ]
+        read_only_fields = ["campaign", "position", "is_alternate", "drawn_at", "seed"]
+
+
+class CampaignSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Campaign
+        fields = ["id", "name", "slug", "winners_count", "alternates_count", "created_at"]
+        read_only_fields = ["id", "created_at"]
+
+    def validate_winners_count(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Debe haber al menos un ganador.")
+        return value
 
 
-class DrawWinnerSerializer(serializers.Serializer):
+class DrawWinnerSerializer(TimedSerializerMixin, serializers.Serializer):
     """
     Ejecuta el sorteo. Si prefieres, hazlo en la view y usa solo WinnerDrawSerializer para la respuesta.
     """
@@ -140,14 +253,14 @@ class DrawWinnerSerializer(serializers.Serializer):
     winner = WinnerDrawSerializer(read_only=True)
 
     def create(self, validated_data):
-        from django.db.models.functions import Random
+        from .draw import draw_contestant, new_seed
 
-        eligible = Contestant.objects.filter(is_verified=True).order_by(Random())
-        winner_contestant = eligible.first()
+        seed = new_seed()
+        winner_contestant = draw_contestant(seed)
         if not winner_contestant:
             raise serializers.ValidationError("No hay concursantes elegibles para el sorteo.")
 
-        winner_draw = WinnerDraw.objects.create(contestant=winner_contestant)
+        winner_draw = WinnerDraw.objects.create(contestant=winner_contestant, seed=seed)
         return {
             "message": f"¡Ganador seleccionado! {winner_contestant.full_name}",
             "winner": winner_draw,
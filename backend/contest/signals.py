@@ -0,0 +1,56 @@
+import time
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import metrics
+from .caching import WINNER_CACHE_KEY, invalidate
+from .models import WinnerDraw
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Activa WAL y busy_timeout en cada conexión SQLite.
+
+    Con WAL las lecturas no bloquean a la escritura (y viceversa), y
+    busy_timeout hace que los escritores concurrentes esperen el lock en vez
+    de fallar de inmediato con "database is locked".
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(post_save, sender=WinnerDraw)
+@receiver(post_delete, sender=WinnerDraw)
+def invalidate_winner_cache(sender, instance, **kwargs):
+    """El ganador cacheado solo cambia con el sorteo único (sin campaña)"""
+    if instance.campaign_id is None:
+        invalidate(WINNER_CACHE_KEY)
+
+
+# Inicio de cada tarea en ejecución en este worker, por task_id
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    if task is not None and task.name.startswith("contest."):
+        _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    """Duración y resultado (SUCCESS/FAILURE/RETRY) de las tareas del concurso"""
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    metrics.TASK_SECONDS.observe(time.perf_counter() - started, task=task.name)
+    if state in ("SUCCESS", "FAILURE", "RETRY"):
+        metrics.TASKS.inc(task=task.name, state=state)
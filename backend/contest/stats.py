@@ -0,0 +1,182 @@
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from . import metrics
+from .models import Contestant
+
+
+logger = logging.getLogger(__name__)
+
+REGISTRATIONS = "registrations"
+VERIFICATIONS = "verified"
+KINDS = (REGISTRATIONS, VERIFICATIONS)
+METRIC_COUNTERS = {REGISTRATIONS: metrics.REGISTRATIONS, VERIFICATIONS: metrics.VERIFICATIONS}
+
+HOUR_TTL = 3 * 24 * 3600
+DAY_TTL = 40 * 24 * 3600
+# Ventanas que recalcula reconcile_stats desde la base
+RECONCILE_HOURS = 48
+RECONCILE_DAYS = 31
+
+
+def _total_key(kind):
+    return f"stats:{kind}:total"
+
+
+def _hour_key(kind, when):
+    return f"stats:{kind}:h:{timezone.localtime(when):%Y%m%d%H}"
+
+
+def _day_key(kind, when):
+    return f"stats:{kind}:d:{timezone.localtime(when):%Y%m%d}"
+
+
+def _incr(kind, amount, when):
+    try:
+        for key, ttl in (
+            (_total_key(kind), None),
+            (_hour_key(kind, when), HOUR_TTL),
+            (_day_key(kind, when), DAY_TTL),
+        ):
+            if not cache.add(key, amount, ttl):
+                cache.incr(key, amount)
+    except Exception as exc:
+        # Los contadores se corrigen en la próxima reconciliación
+        logger.warning("Stats: no se pudo incrementar %s: %s", kind, exc)
+
+
+def _record(kind, amount):
+    if amount <= 0:
+        return
+    when = timezone.now()
+
+    def commit():
+        _incr(kind, amount, when)
+        # Contador monótono para /metrics (la reconciliación no lo toca)
+        METRIC_COUNTERS[kind].inc(amount)
+
+    # Solo cuenta si la transacción que inscribe/verifica hace commit
+    transaction.on_commit(commit)
+
+
+def record_registrations(amount=1):
+    _record(REGISTRATIONS, amount)
+
+
+def record_verifications(amount=1):
+    _record(VERIFICATIONS, amount)
+
+
+def _database_values(hours, days):
+    """Contadores calculados desde la base, por clave de cache"""
+    now = timezone.now()
+    values = {
+        _total_key(REGISTRATIONS): Contestant.objects.count(),
+        _total_key(VERIFICATIONS): Contestant.objects.filter(is_verified=True).count(),
+    }
+
+    hour_start = timezone.localtime(now).replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+    day_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    for kind, field, qs in (
+        (REGISTRATIONS, "created_at", Contestant.objects.all()),
+        (VERIFICATIONS, "verified_at", Contestant.objects.filter(is_verified=True)),
+    ):
+        for i in range(hours):
+            values[_hour_key(kind, hour_start + timedelta(hours=i))] = 0
+        for i in range(days):
+            values[_day_key(kind, day_start + timedelta(days=i))] = 0
+        for trunc, start, key in ((TruncHour, hour_start, _hour_key), (TruncDay, day_start, _day_key)):
+            rows = (
+                qs.filter(**{f"{field}__gte": start})
+                .annotate(bucket=trunc(field))
+                .values("bucket")
+                .annotate(n=Count("id"))
+                .order_by()
+            )
+            for row in rows:
+                values[key(kind, row["bucket"])] = row["n"]
+    return values
+
+
+def reconcile_stats(hours=RECONCILE_HOURS, days=RECONCILE_DAYS):
+    """
+    Recalcula los contadores desde la base y los escribe en el cache.
+
+    Corrige la deriva de los contadores incrementales (caídas de Redis,
+    borrados, importaciones). Pensada para correr periódicamente.
+
+    Returns:
+        dict: Totales recalculados
+    """
+    values = _database_values(hours, days)
+    by_ttl = {None: {}, HOUR_TTL: {}, DAY_TTL: {}}
+    for key, value in values.items():
+        ttl = HOUR_TTL if ":h:" in key else DAY_TTL if ":d:" in key else None
+        by_ttl[ttl][key] = value
+    for ttl, group in by_ttl.items():
+        cache.set_many(group, ttl)
+    return {kind: values[_total_key(kind)] for kind in KINDS}
+
+
+def dashboard_stats(hours=24, days=14):
+    """
+    Arma las estadísticas del dashboard admin leyendo solo el cache.
+
+    Si faltan los totales (cache vacío) se reconcilia una vez desde la base.
+    Si el cache no responde, las cifras se calculan desde la base.
+
+    Returns:
+        dict: Totales, tasa de verificación y series por hora y por día
+    """
+    now = timezone.localtime()
+    hour_slots = [
+        now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=i)
+        for i in reversed(range(hours))
+    ]
+    day_slots = [
+        now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=i)
+        for i in reversed(range(days))
+    ]
+
+    keys = [_total_key(kind) for kind in KINDS]
+    for kind in KINDS:
+        keys += [_hour_key(kind, slot) for slot in hour_slots]
+        keys += [_day_key(kind, slot) for slot in day_slots]
+    try:
+        totals = cache.get_many([_total_key(kind) for kind in KINDS])
+        if len(totals) < len(KINDS):
+            reconcile_stats()
+        values = cache.get_many(keys)
+    except Exception as exc:
+        logger.warning("Stats: cache no disponible, se calculan desde la base: %s", exc)
+        values = _database_values(hours, days)
+
+    registrations = values.get(_total_key(REGISTRATIONS), 0)
+    verified = values.get(_total_key(VERIFICATIONS), 0)
+    return {
+        "registrations": registrations,
+        "verified": verified,
+        "verification_rate": round(verified / registrations, 4) if registrations else 0.0,
+        "per_hour": [
+            {
+                "hour": slot.isoformat(),
+                "registrations": values.get(_hour_key(REGISTRATIONS, slot), 0),
+                "verified": values.get(_hour_key(VERIFICATIONS, slot), 0),
+            }
+            for slot in hour_slots
+        ],
+        "per_day": [
+            {
+                "day": slot.date().isoformat(),
+                "registrations": values.get(_day_key(REGISTRATIONS, slot), 0),
+                "verified": values.get(_day_key(VERIFICATIONS, slot), 0),
+            }
+            for slot in day_slots
+        ],
+    }
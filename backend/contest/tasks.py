@@ -1,7 +1,76 @@
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from smtplib import SMTPException, SMTPRecipientsRefused
+
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
-from .models import Contestant
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .emails import render_verification_email, render_winner_email
+from .deliveries import record_deliveries
+from .metrics import SMTP_SECONDS
+from .models import Contestant, EmailDelivery, EmailVerificationToken
+
+logger = logging.getLogger(__name__)
+
+# Opciones de las tareas de mail: errores SMTP y de red se reintentan con
+# backoff exponencial y jitter; un destinatario rechazado no se reintenta.
+MAIL_TASK_OPTIONS = {
+    "ignore_result": True,
+    "autoretry_for": (SMTPException, OSError),
+    "dont_autoretry_for": (SMTPRecipientsRefused,),
+    "retry_backoff": True,
+    "retry_backoff_max": settings.MAIL_TASK_RETRY_BACKOFF_MAX,
+    "retry_jitter": True,
+    "max_retries": settings.MAIL_TASK_MAX_RETRIES,
+    "acks_late": True,
+}
+
+
+def _failure_status(task, exc):
+    """RETRYING si autoretry_for va a reintentar este error, si no FAILED"""
+    retryable = isinstance(exc, task.autoretry_for) and not isinstance(exc, task.dont_autoretry_for)
+    if retryable and task.request.retries < task.max_retries:
+        return EmailDelivery.RETRYING
+    return EmailDelivery.FAILED
+
+
+@contextmanager
+def _tracked_delivery(task, kind, messages):
+    """
+    Registra en EmailDelivery el resultado del envío del bloque (un solo email
+    por tarea), con un upsert para sus mensajes (contestant_id, reference).
+    """
+    attempts = task.request.retries + 1
+    try:
+        yield
+    except Exception as exc:
+        status = _failure_status(task, exc)
+        record_deliveries(kind, [(cid, ref, status, attempts, repr(exc)) for cid, ref in messages])
+        raise
+    record_deliveries(kind, [(cid, ref, EmailDelivery.SENT, attempts, "") for cid, ref in messages])
+
+def _build_html_email(subject, text, html, to, connection=None):
+    """
+    Arma un email HTML con texto alternativo.
+
+    Args:
+        subject (str): Asunto del email
+        text (str): Versión de texto plano del mensaje
+        html (str): Versión HTML del mensaje
+        to (str): Email del destinatario
+        connection: Conexión de email a reutilizar (opcional)
+
+    Returns:
+        EmailMultiAlternatives: Mensaje listo para enviar
+    """
+    from_email = f"{settings.HOTEL_NAME} <{settings.DEFAULT_FROM_EMAIL}>"
+    msg = EmailMultiAlternatives(subject, text, from_email, [to], connection=connection)
+    msg.attach_alternative(html, "text/html")
+    return msg
 
 def _send_html_email(subject, text, html, to):
     """
@@ -13,15 +82,16 @@ def _send_html_email(subject, text, html, to):
         html (str): Versión HTML del mensaje
         to (str): Email del destinatario
     """
-    from_email = f"{settings.HOTEL_NAME} <{settings.DEFAULT_FROM_EMAIL}>"
-    msg = EmailMultiAlternatives(subject, text, from_email, [to])
-    msg.attach_alternative(html, "text/html")
-    msg.send()
+    with SMTP_SECONDS.time(kind="single"):
+        _build_html_email(subject, text, html, to).send()
 
-@shared_task
-def send_verification_email(contestant_id, token):
+@shared_task(bind=True, **MAIL_TASK_OPTIONS)
+def send_verification_email(self, contestant_id, token):
     """
     Envía email de verificación a un concursante con HTML y texto alternativo.
+
+    Los errores SMTP/de red se reintentan (MAIL_TASK_OPTIONS); si el
+    concursante ya no existe no hay nada que reintentar.
     
     Args:
         contestant_id (int): ID del concursante en la base de datos
@@ -32,34 +102,36 @@ def send_verification_email(contestant_id, token):
     """
     try:
         c = Contestant.objects.get(id=contestant_id)
-        verification_url = f"{settings.FRONTEND_URL}/verify?token={token}"
-        
-        subject = f"[{settings.HOTEL_NAME}] Verifica tu email – Concurso San Valentín"
-        text = f"Hola {c.full_name}\n\nPara participar en el concurso de San Valentín del {settings.HOTEL_NAME}, verifica tu correo: {verification_url}\n(Este enlace expira en 2 horas)"
-        html = f"""
-        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; text-align: center;">
-            <h2 style="color: #e91e63;">¡Hola {c.full_name}!</h2>
-            <p>¡Gracias por inscribirte en el concurso de San Valentín del <strong>{settings.HOTEL_NAME}</strong>!</p>
-            <p>Para completar tu registro y participar en el sorteo, haz clic en el siguiente botón:</p>
-            <div style="text-align: center; margin: 30px 0;">
-            <a href="{verification_url}" style="background-color: #e91e63; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">
-                Verificar mi cuenta
-            </a>
-            </div>
-            <p><small style="color: #666;">Este enlace expira en 2 horas.</small></p>
-            <p>¡Buena suerte!<br><strong>{settings.HOTEL_NAME}</strong></p>
-        </div>
-        """
-        
-        _send_html_email(subject, text, html, c.email)
-        
-    except Exception as e:
-        print(f"Error enviando email de verificación: {e}")
+    except Contestant.DoesNotExist:
+        logger.warning("Verificación: el concursante %s ya no existe", contestant_id)
+        return
 
-@shared_task
-def send_winner_notification(contestant_id):
+    with _tracked_delivery(self, EmailDelivery.VERIFICATION, [(c.id, token)]):
+        with SMTP_SECONDS.time(kind="single"):
+            _verification_email(c, token).send()
+    EmailVerificationToken.objects.filter(token=token, sent_at__isnull=True).update(sent_at=timezone.now())
+
+def _verification_email(c, token, connection=None):
+    """
+    Arma el email de verificación de un concursante.
+
+    Args:
+        c (Contestant): Concursante destinatario
+        token (str): Token UUID para verificación de email
+        connection: Conexión de email a reutilizar (opcional)
+
+    Returns:
+        EmailMultiAlternatives: Mensaje listo para enviar
+    """
+    subject, text, html = render_verification_email(c, token)
+    return _build_html_email(subject, text, html, c.email, connection=connection)
+
+@shared_task(bind=True, **MAIL_TASK_OPTIONS)
+def send_winner_notification(self, contestant_id):
     """
     Envía notificación de ganador a un concursante con HTML y texto alternativo.
+
+    Va por la cola mail_winner, separada de las verificaciones.
     
     Args:
         contestant_id (int): ID del concursante ganador en la base de datos
@@ -69,23 +141,141 @@ def send_winner_notification(contestant_id):
     """
     try:
         c = Contestant.objects.get(id=contestant_id)
-        
-        subject = f"🎉 ¡FELICIDADES! Eres el ganador – {settings.HOTEL_NAME}"
-        text = f"¡Hola {c.full_name}!\n\n¡Felicitaciones! Eres el ganador del concurso de San Valentín del {settings.HOTEL_NAME}.\nTe contactaremos pronto para coordinar tu premio."
-        html = f"""
-        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; text-align: center;">
-            <h1 style="color: #e91e63;">🎉 ¡FELICIDADES! 🎉</h1>
-            <h2>¡Hola {c.full_name}!</h2>
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                <p style="font-size: 18px;"><strong>¡Has sido seleccionado como el GANADOR del concurso de San Valentín del <strong>{settings.HOTEL_NAME}</strong>!</strong></p>
-                <p style="font-size: 16px; color: #e91e63;"><strong>🏆 Tu premio: 2 noches románticas en nuestro hotel</strong></p>
-            </div>
-            <p>Nos pondremos en contacto contigo pronto para coordinar todos los detalles.</p>
-            <p>¡Disfruta tu premio!<br><strong>{settings.HOTEL_NAME}</strong><br><em>Escápate con estilo</em></p>
-        </div>
-        """
-        
+    except Contestant.DoesNotExist:
+        logger.warning("Ganador: el concursante %s ya no existe", contestant_id)
+        return
+
+    subject, text, html = render_winner_email(c)
+    with _tracked_delivery(self, EmailDelivery.WINNER, [(c.id, "")]):
         _send_html_email(subject, text, html, c.email)
-        
-    except Exception as e:
-        print(f"Error enviando email al ganador: {e}")
\ No newline at end of file
+
+
+def _claim_pending_tokens(batch_size):
+    """
+    Toma un lote de tokens con email de verificación pendiente.
+
+    Marca claimed_at dentro de la misma transacción para que otro worker no
+    tome el mismo lote (en Postgres con SKIP LOCKED). La toma vence tras
+    VERIFICATION_EMAIL_CLAIM_TIMEOUT: si el worker muere antes de marcar
+    sent_at, un drenado posterior vuelve a tomar esos tokens.
+
+    Returns:
+        list[EmailVerificationToken]: Tokens tomados, con su concursante
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.VERIFICATION_EMAIL_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        ids = list(
+            EmailVerificationToken.objects
+            .select_for_update(skip_locked=True)
+            .filter(sent_at__isnull=True, used_at__isnull=True, expires_at__gt=now)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=stale))
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        EmailVerificationToken.objects.filter(id__in=ids).update(claimed_at=now)
+    return list(EmailVerificationToken.objects.filter(id__in=ids).select_related("contestant"))
+
+
+@shared_task(bind=True, **MAIL_TASK_OPTIONS)
+def send_pending_verification_emails(self, batch_size=None):
+    """
+    Envía por lotes los emails de verificación pendientes.
+
+    Todos los lotes usan una sola conexión SMTP (un solo handshake TLS), pero
+    cada mensaje se envía por separado para conocer su resultado:
+
+    - Un destinatario rechazado (o un mensaje que el backend no envió) queda
+      como FAILED y su token con sent_at, así que no bloquea los siguientes
+      drenados.
+    - Ante otro error solo se liberan los tokens del lote aún no enviados,
+      para que el reintento (con backoff) no repita los ya entregados.
+    - sent_at se marca al terminar cada lote. Si el worker muere a mitad de
+      un lote, sus tokens se vuelven a tomar cuando vence la toma.
+
+    Args:
+        batch_size (int): Emails por lote (por defecto VERIFICATION_EMAIL_BATCH_SIZE)
+
+    Returns:
+        int: Cantidad de emails enviados
+    """
+    batch_size = batch_size or settings.VERIFICATION_EMAIL_BATCH_SIZE
+    sent = 0
+    with get_connection() as connection:
+        while True:
+            tokens = _claim_pending_tokens(batch_size)
+            if not tokens:
+                break
+            outcomes = []
+            done = []
+            attempts = self.request.retries + 1
+            try:
+                for position, t in enumerate(tokens):
+                    delivery = (t.contestant_id, str(t.token))
+                    message = _verification_email(t.contestant, t.token, connection)
+                    try:
+                        with SMTP_SECONDS.time(kind="batch"):
+                            delivered = connection.send_messages([message])
+                    except SMTPRecipientsRefused as exc:
+                        logger.warning("Verificación: destinatario rechazado %s", t.contestant.email)
+                        outcomes.append((*delivery, EmailDelivery.FAILED, attempts, repr(exc)))
+                        done.append(t.id)
+                        continue
+                    done.append(t.id)
+                    if delivered:
+                        outcomes.append((*delivery, EmailDelivery.SENT, attempts, ""))
+                        sent += 1
+                    else:
+                        outcomes.append((*delivery, EmailDelivery.FAILED, attempts, "El backend no envió el mensaje"))
+            except Exception as exc:
+                outcomes.append((*delivery, _failure_status(self, exc), attempts, repr(exc)))
+                unsent = [pending.id for pending in tokens[position:]]
+                EmailVerificationToken.objects.filter(id__in=unsent).update(claimed_at=None)
+                raise
+            finally:
+                EmailVerificationToken.objects.filter(id__in=done).update(sent_at=timezone.now())
+                # Un solo upsert de EmailDelivery por lote, con el resultado de cada mensaje
+                record_deliveries(EmailDelivery.VERIFICATION, outcomes)
+    return sent
+
+
+@shared_task
+def relay_outbox_messages(batch_size=None):
+    """
+    Publica los mensajes pendientes del outbox (tarea periódica de celery beat).
+
+    Returns:
+        int: Mensajes publicados
+    """
+    from .outbox import relay_outbox
+
+    return relay_outbox(batch_size=batch_size)
+
+
+@shared_task
+def purge_stale_records():
+    """
+    Limpia tokens vencidos/usados, outbox publicado y concursantes sin verificar
+    (tarea periódica de celery beat).
+
+    Returns:
+        dict: Filas borradas por tipo
+    """
+    from .cleanup import purge_stale_records as purge
+
+    return purge()
+
+
+@shared_task
+def reconcile_dashboard_stats():
+    """
+    Recalcula desde la base los contadores del dashboard (tarea periódica).
+
+    Returns:
+        dict: Totales recalculados
+    """
+    from .stats import reconcile_stats
+
+    return reconcile_stats()
@@ -1,11 +1,36 @@
-from django.test import TestCase, override_settings
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
 import uuid
+from datetime import timedelta
+from unittest import mock
 
-from .models import Contestant, EmailVerificationToken, WinnerDraw
+from . import outbox as outbox_module
+from .hashing import ahash_password, hash_password
+from .cleanup import purge_stale_records
+from .draw import draw_contestant
+from .stats import reconcile_stats
+from .emails import render_verification_email, render_winner_email
+from .importer import import_contestants
+from .outbox import relay_outbox
+from .tasks import send_pending_verification_emails
+from .models import Campaign, Contestant, EmailDelivery, EmailVerificationToken, OutboxMessage, WinnerDraw
 
 
 class ContestAPITests(TestCase):
@@ -97,3 +122,1492 @@ class ContestAPITests(TestCase):
         # Segundo sorteo debe fallar
         response2 = self.client.post(url)
         self.assertEqual(response2.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ContestantPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        for i in range(7):
+            Contestant.objects.create(
+                first_name=f'Nombre{i}',
+                last_name='Apellido',
+                email=f'c{i}@test.com',
+                phone='+56912345678',
+                is_verified=i % 2 == 0,
+            )
+        self.url = reverse('contest:admin-contestants')
+
+    def test_paginacion_cursor_recorre_todo(self):
+        """El modo cursor recorre todas las filas sin repetir y permite volver"""
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['count'])
+        self.assertIsNone(response.data['prev'])
+
+        seen = [c['id'] for c in response.data['contestants']]
+        pages = [seen[:]]
+        next_cursor = response.data['next']
+        while next_cursor:
+            response = self.client.get(self.url, {'cursor': next_cursor, 'page_size': 3})
+            ids = [c['id'] for c in response.data['contestants']]
+            pages.append(ids)
+            seen.extend(ids)
+            next_cursor = response.data['next']
+
+        expected = list(Contestant.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        # Volver a la página anterior desde la última
+        response = self.client.get(self.url, {'cursor': response.data['prev'], 'page_size': 3})
+        self.assertEqual([c['id'] for c in response.data['contestants']], pages[-2])
+
+    def test_paginacion_cursor_con_filtro_y_conteo(self):
+        """El cursor respeta filtros y el conteo es opcional"""
+        response = self.client.get(self.url, {
+            'pagination': 'cursor', 'verified': 'true', 'count': 'exact', 'page_size': 10,
+        })
+        self.assertEqual(response.data['count'], 4)
+        self.assertTrue(all(c['is_verified'] for c in response.data['contestants']))
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(self.url, {'count': 'approx'})
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_is_estimate'])
+
+    def test_listado_rapido_igual_al_serializer(self):
+        """El camino .values() devuelve exactamente lo mismo que ContestantSerializer"""
+        from .serializers import ContestantSerializer
+
+        Contestant.objects.filter(email='c0@test.com').update(second_last_name='Pérez')
+        expected = ContestantSerializer(Contestant.objects.order_by('-created_at', '-id'), many=True).data
+        response = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(json.loads(response.content)['contestants'], json.loads(json.dumps(expected)))
+        cursor_page = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 10})
+        self.assertEqual(cursor_page.json()['contestants'], response.json()['contestants'])
+        self.assertIn('Pérez', [c['full_name'].split()[-1] for c in response.json()['contestants']])
+
+    def test_cursor_invalido(self):
+        """Un cursor malformado responde 400"""
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ContestantSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.contestant = Contestant.objects.create(
+            first_name='José',
+            last_name='Núñez',
+            second_last_name='Pérez',
+            email='jose@test.com',
+            phone='+56912345678',
+        )
+        Contestant.objects.create(
+            first_name='Ana',
+            last_name='Soto',
+            email='ana@test.com',
+            phone='+56912345678',
+        )
+        self.url = reverse('contest:admin-contestants')
+
+    def test_search_text_se_sincroniza_al_guardar(self):
+        """La columna de búsqueda se recalcula en save(), incluso con update_fields"""
+        self.assertEqual(self.contestant.search_text, 'jose nunez perez jose@test.com')
+        self.contestant.last_name = 'Muñoz'
+        self.contestant.save(update_fields=['last_name'])
+        self.contestant.refresh_from_db()
+        self.assertIn('munoz', self.contestant.search_text)
+
+    def test_busqueda_sin_tildes_ni_mayusculas(self):
+        """La búsqueda ignora tildes y mayúsculas y exige todas las palabras"""
+        for term in ('NUNEZ', 'núñez pérez', 'jose@test'):
+            response = self.client.get(self.url, {'search': term})
+            self.assertEqual([c['id'] for c in response.data['contestants']], [self.contestant.id], term)
+
+        response = self.client.get(self.url, {'search': 'nunez soto'})
+        self.assertEqual(response.data['contestants'], [])
+
+
+class HotPathIndexTests(TestCase):
+    """Verifica con EXPLAIN que las consultas calientes usan sus índices"""
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Con tablas vacías el planner preferiría un seq scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"Se esperaba uno de {index_names} en el plan:\n{plan}"
+        )
+
+    def test_listado_admin(self):
+        base = Contestant.objects.order_by('-created_at', '-id')
+        self.assertUsesIndex(base[:50], 'contestant_created_id')
+        self.assertUsesIndex(base.filter(is_verified=True)[:50], 'contestant_verified_created')
+        self.assertUsesIndex(base.filter(is_verified=False)[:50], 'contestant_pending_created')
+
+    def test_sorteo(self):
+        eligible = Contestant.objects.filter(is_verified=True, id__gte=10).order_by('id')[:1]
+        self.assertUsesIndex(eligible, 'contestant_eligible_id')
+
+    def test_tokens(self):
+        pending = EmailVerificationToken.objects.filter(token=uuid.uuid4(), used_at__isnull=True)
+        self.assertUsesIndex(pending, 'sqlite_autoindex_contest_emailverificationtoken', 'token_key')
+        expired = EmailVerificationToken.objects.filter(expires_at__lt=timezone.now())
+        self.assertUsesIndex(expired, 'token_expires_at')
+        latest = EmailVerificationToken.objects.filter(
+            contestant_id=1, used_at__isnull=True
+        ).order_by('-created_at')[:1]
+        self.assertUsesIndex(latest, 'token_pending_by_contestant')
+
+
+class DrawEngineTests(TestCase):
+    def setUp(self):
+        self.contestants = [
+            Contestant.objects.create(
+                first_name=f'Nombre{i}',
+                last_name='Apellido',
+                email=f'd{i}@test.com',
+                phone='+56912345678',
+                is_verified=i % 3 != 0,
+            )
+            for i in range(12)
+        ]
+        self.eligible_ids = {c.id for c in self.contestants if c.is_verified}
+
+    def test_misma_semilla_mismo_ganador(self):
+        """El sorteo es reproducible a partir de la semilla registrada"""
+        for seed in range(20):
+            winner = draw_contestant(seed)
+            self.assertIn(winner.id, self.eligible_ids)
+            self.assertEqual(draw_contestant(seed).id, winner.id)
+
+    def test_todos_los_elegibles_pueden_ganar(self):
+        """Con distintas semillas salen todos los elegibles y ningún excluido"""
+        excluded = min(self.eligible_ids)
+        winners = {draw_contestant(seed, exclude_ids=[excluded]).id for seed in range(300)}
+        self.assertEqual(winners, self.eligible_ids - {excluded})
+
+    def test_rango_disperso_y_sin_elegibles(self):
+        """Cae al ranking si los ids elegibles son muy dispersos"""
+        Contestant.objects.filter(id__in=self.eligible_ids).update(is_verified=False)
+        self.assertIsNone(draw_contestant(1))
+
+        first, last = self.contestants[1], self.contestants[-1]
+        last.id = first.id + 10_000_000
+        last.email = 'lejos@test.com'
+        last.is_verified = True
+        last.save()
+        Contestant.objects.filter(id=first.id).update(is_verified=True)
+        winners = {draw_contestant(seed).id for seed in range(40)}
+        self.assertEqual(winners, {first.id, last.id})
+
+    def test_baja_densidad_no_carga_todos_los_ids(self):
+        """Con pocos elegibles en un rango grande sigue muestreando en vez de cargar todos los ids"""
+        from . import draw as draw_module
+
+        Contestant.objects.bulk_create([
+            Contestant(
+                first_name='Relleno', last_name='Apellido', email=f'r{i}@test.com', phone='+56912345678',
+                is_verified=i % 50 == 0,
+            )
+            for i in range(2000)
+        ])
+        eligible = set(Contestant.objects.filter(is_verified=True).values_list('id', flat=True))
+        # Sin rondas iniciales: pasa directo al conteo y al muestreo con densidad exacta
+        with mock.patch.object(draw_module, 'MAX_SAMPLING_QUERIES', 0), \
+                CaptureQueriesContext(connection) as ctx:
+            sample = draw_module.sample_contestants(7, 5)
+        ids = [c.id for c in sample]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertTrue(set(ids) <= eligible)
+        pool_queries = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT "contest_contestant"."id" FROM')]
+        self.assertEqual(pool_queries, [])
+        with mock.patch.object(draw_module, 'MAX_SAMPLING_QUERIES', 0):
+            self.assertEqual([c.id for c in draw_module.sample_contestants(7, 5)], ids)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class CampaignDrawTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        for i in range(8):
+            Contestant.objects.create(
+                first_name=f'Nombre{i}',
+                last_name='Apellido',
+                email=f'k{i}@test.com',
+                phone='+56912345678',
+                is_verified=i != 0,
+            )
+
+    def test_crear_campana_y_sortear(self):
+        """Sortea N ganadores + suplentes distintos con un solo INSERT"""
+        response = self.client.post(reverse('contest:admin-campaigns'), {
+            'name': 'Verano 2026', 'slug': 'verano-2026', 'winners_count': 3, 'alternates_count': 2,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        url = reverse('contest:admin-campaign-draw', args=['verano-2026'])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "contest_winnerdraw"')]
+        self.assertEqual(len(inserts), 1)
+
+        draws = response.data['draws']
+        self.assertEqual([d['position'] for d in draws], [1, 2, 3, 4, 5])
+        self.assertEqual([d['is_alternate'] for d in draws], [False] * 3 + [True] * 2)
+        self.assertEqual(len({d['contestant'] for d in draws}), 5)
+        self.assertTrue(Contestant.objects.filter(
+            id__in=[d['contestant'] for d in draws], is_verified=True
+        ).count() == 5)
+
+        # Una segunda vez no se permite, pero el sorteo único sigue disponible
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('contest:admin-winner'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['draws']), 5)
+
+    def test_campana_con_menos_elegibles_que_cupos(self):
+        """Si faltan elegibles se sortean todos los disponibles"""
+        Campaign.objects.create(name='Otoño', slug='otono', winners_count=5, alternates_count=5)
+        response = self.client.post(reverse('contest:admin-campaign-draw', args=['otono']))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['draws']), 7)
+
+
+class ContestantImportTests(TestCase):
+    CSV = (
+        "first_name,last_name,second_last_name,email,phone\n"
+        " Ana ,Soto,,ANA@test.com,+56911111111\n"
+        "Luis,Rojas,Díaz,luis@test.com,+56922222222\n"
+        "Ana,Soto,,ana@test.com,+56911111111\n"
+        "Sin,Email,,,+56933333333\n"
+        "Pre,Existente,,existe@test.com,+56944444444\n"
+        "Tel,Malo,,tel@test.com,123\n"
+    )
+
+    def setUp(self):
+        Contestant.objects.create(
+            first_name='Pre', last_name='Existente', email='existe@test.com', phone='+56944444444'
+        )
+
+    def test_importa_por_lotes_con_deduplicacion(self):
+        """Normaliza, valida y deduplica contra el lote y la base"""
+        result = import_contestants(io.StringIO(self.CSV), 'csv', batch_size=2)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.duplicates, 2)
+        self.assertEqual(result.invalid, 2)
+        self.assertEqual([e['line'] for e in result.errors], [5, 7])
+
+        self.assertEqual(Contestant.objects.count(), 3)
+        ana = Contestant.objects.get(email='ana@test.com')
+        self.assertEqual(ana.first_name, 'Ana')
+        self.assertEqual(ana.search_text, 'ana soto ana@test.com')
+        self.assertEqual(EmailVerificationToken.objects.filter(contestant__email='luis@test.com').count(), 1)
+
+    def test_comando_import_contestants(self):
+        """El comando lee el archivo y muestra el resumen"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as fh:
+            fh.write(self.CSV)
+        self.addCleanup(os.unlink, fh.name)
+        out = io.StringIO()
+        call_command('import_contestants', fh.name, stdout=out)
+        self.assertIn('Importados 2, duplicados 2, inválidos 2', out.getvalue())
+
+    def test_sin_envio_no_entra_al_drenado(self):
+        """Los importados con send_emails=False no reciben email en el drenado por lotes"""
+        import_contestants(io.StringIO(self.CSV), 'csv', send_emails=False)
+        self.assertEqual(send_pending_verification_emails.apply().get(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_importacion_con_envio_no_arrastra_las_anteriores(self):
+        """Una importación con send_emails=True solo envía a sus propios inscritos"""
+        import_contestants(io.StringIO(self.CSV), 'csv', send_emails=False)
+        csv_nuevo = "first_name,last_name,email,phone\nEva,Paz,eva@test.com,+56955555555\n"
+        import_contestants(io.StringIO(csv_nuevo), 'csv', send_emails=True)
+        self.assertEqual(send_pending_verification_emails.apply().get(), 1)
+        self.assertEqual([m.to[0] for m in mail.outbox], ['eva@test.com'])
+
+    def test_endpoint_admin_jsonl(self):
+        """El endpoint admin acepta JSONL y exige autenticación"""
+        client = APIClient()
+        url = reverse('contest:admin-contestants-import')
+        lines = [
+            json.dumps({'first_name': 'Eva', 'last_name': 'Paz', 'email': 'eva@test.com', 'phone': '+56955555555'}),
+            'no es json',
+        ]
+        upload = SimpleUploadedFile('lista.jsonl', '\n'.join(lines).encode())
+        self.assertEqual(client.post(url, {'file': upload}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        client.force_authenticate(User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123'))
+        upload = SimpleUploadedFile('lista.jsonl', '\n'.join(lines).encode())
+        response = client.post(url, {'file': upload})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['invalid'], 1)
+        self.assertTrue(Contestant.objects.filter(email='eva@test.com').exists())
+
+
+class ContestantExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123'))
+        Contestant.objects.create(
+            first_name='José', last_name='Núñez', email='jose@test.com', phone='+56911111111', is_verified=True
+        )
+        Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56922222222'
+        )
+        self.url = reverse('contest:admin-contestants-export')
+
+    def test_exporta_csv_con_filtros(self):
+        """El CSV se entrega en streaming y respeta verified/search"""
+        response = self.client.get(self.url, {'verified': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:3], ['José', 'Núñez'])
+        self.assertEqual(rows[1][6], 'sí')
+
+        response = self.client.get(self.url, {'search': 'soto'})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual([r[4] for r in rows[1:]], ['ana@test.com'])
+
+    def test_neutraliza_formulas(self):
+        """Las celdas que Excel ejecutaría como fórmula salen con ' delante"""
+        Contestant.objects.create(
+            first_name='=HYPERLINK("http://x")', last_name='@SUM(A1)', email='formula@test.com', phone='56933333333'
+        )
+        response = self.client.get(self.url, {'search': 'formula@test.com'})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(rows[1][1:3], ['\'=HYPERLINK("http://x")', "'@SUM(A1)"])
+        self.assertEqual(rows[1][4:6], ['formula@test.com', '56933333333'])
+
+    def test_formato_no_soportado(self):
+        response = self.client.get(self.url, {'file_type': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BatchedVerificationEmailTests(TestCase):
+    def setUp(self):
+        self.tokens = []
+        for i in range(5):
+            contestant = Contestant.objects.create(
+                first_name=f'Nombre{i}', last_name='Apellido', email=f'b{i}@test.com', phone='+56912345678'
+            )
+            self.tokens.append(EmailVerificationToken.objects.create(contestant=contestant))
+        # Token ya usado: no se envía
+        self.tokens[0].used_at = timezone.now()
+        self.tokens[0].save()
+
+    def test_drena_pendientes_por_lotes(self):
+        """Envía los pendientes en lotes y no repite envíos"""
+        sent = send_pending_verification_emails.apply(kwargs={'batch_size': 2}).get()
+        self.assertEqual(sent, 4)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox), ['b1@test.com', 'b2@test.com', 'b3@test.com', 'b4@test.com']
+        )
+        self.assertIn(str(self.tokens[1].token), mail.outbox[0].body)
+        self.assertFalse(EmailVerificationToken.objects.filter(sent_at__isnull=True, used_at__isnull=True).exists())
+
+        self.assertEqual(send_pending_verification_emails.apply().get(), 0)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_toma_vencida_vuelve_a_la_cola(self):
+        """Si el worker muere tras tomar un lote, un drenado posterior lo recupera al vencer la toma"""
+        from .tasks import _claim_pending_tokens
+
+        claimed = _claim_pending_tokens(2)
+        self.assertEqual(len(claimed), 2)
+        # La toma no marca sent_at: el email todavía no se envió
+        claimed_ids = [t.pk for t in claimed]
+        self.assertFalse(EmailVerificationToken.objects.filter(pk__in=claimed_ids, sent_at__isnull=False).exists())
+
+        self.assertEqual(send_pending_verification_emails.apply().get(), 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['b3@test.com', 'b4@test.com'])
+
+        stale = timezone.now() - timedelta(seconds=settings.VERIFICATION_EMAIL_CLAIM_TIMEOUT + 1)
+        EmailVerificationToken.objects.filter(pk__in=claimed_ids).update(claimed_at=stale)
+        self.assertEqual(send_pending_verification_emails.apply().get(), 2)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertFalse(EmailVerificationToken.objects.filter(sent_at__isnull=True, used_at__isnull=True).exists())
+
+    def test_registra_envios_con_un_upsert_por_lote(self):
+        """Cada lote escribe sus EmailDelivery con una sola consulta"""
+        with CaptureQueriesContext(connection) as ctx:
+            send_pending_verification_emails.apply(kwargs={'batch_size': 2})
+        writes = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "contest_emaildelivery"')]
+        self.assertEqual(len(writes), 2)
+        deliveries = EmailDelivery.objects.filter(kind=EmailDelivery.VERIFICATION)
+        self.assertEqual(deliveries.filter(status=EmailDelivery.SENT, attempts=1).count(), 4)
+        self.assertEqual(
+            set(deliveries.values_list('reference', flat=True)), {str(t.token) for t in self.tokens[1:]}
+        )
+
+    def _failing_send(self, failures):
+        """send_messages de locmem que lanza failures[email] (una vez) para ese destinatario"""
+        original = mail.get_connection().__class__.send_messages
+
+        def send_messages(backend, messages):
+            to = messages[0].to[0]
+            if to in failures:
+                raise failures.pop(to)
+            return original(backend, messages)
+
+        return mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', send_messages)
+
+    def test_no_toma_tokens_de_envio_individual(self):
+        """Los tokens con envío individual encolado no se reenvían al drenar"""
+        with override_settings(VERIFICATION_EMAIL_BATCHING=False), self.captureOnCommitCallbacks(execute=False):
+            response = APIClient().post(reverse('contest:contestants'), {
+                'first_name': 'Ines', 'last_name': 'Rojas', 'email': 'ines@test.com', 'phone': '+56912345678',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(EmailVerificationToken.objects.get(contestant__email='ines@test.com').sent_at)
+
+        send_pending_verification_emails.apply()
+        self.assertNotIn('ines@test.com', [m.to[0] for m in mail.outbox])
+
+    def test_destinatario_rechazado_no_bloquea_la_cola(self):
+        """Un rechazo permanente queda FAILED, sin liberar el token ni repetir los enviados"""
+        from smtplib import SMTPRecipientsRefused
+
+        refused = SMTPRecipientsRefused({'b1@test.com': (550, b'No such user')})
+        with self._failing_send({'b1@test.com': refused}), self.assertLogs('contest.tasks', 'WARNING'):
+            sent = send_pending_verification_emails.apply(kwargs={'batch_size': 2}).get()
+        self.assertEqual(sent, 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['b2@test.com', 'b3@test.com', 'b4@test.com'])
+        self.assertIsNotNone(EmailVerificationToken.objects.get(pk=self.tokens[1].pk).sent_at)
+        delivery = EmailDelivery.objects.get(contestant=self.tokens[1].contestant)
+        self.assertEqual(delivery.status, EmailDelivery.FAILED)
+
+        self.assertEqual(send_pending_verification_emails.apply().get(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_error_transitorio_libera_solo_los_no_enviados(self):
+        """El reintento envía lo que faltaba sin repetir lo ya entregado"""
+        from smtplib import SMTPServerDisconnected
+
+        with self._failing_send({'b2@test.com': SMTPServerDisconnected('caída')}):
+            send_pending_verification_emails.apply(kwargs={'batch_size': 10}, throw=False)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['b1@test.com', 'b2@test.com', 'b3@test.com', 'b4@test.com'])
+        self.assertEqual(
+            EmailDelivery.objects.get(contestant=self.tokens[2].contestant).status, EmailDelivery.SENT
+        )
+
+    def test_registra_el_resultado_real_de_cada_mensaje(self):
+        """Un fallo a mitad de lote no marca como fallidos los ya enviados ni como enviados los pendientes"""
+        from smtplib import SMTPServerDisconnected
+
+        with self._failing_send({'b3@test.com': SMTPServerDisconnected('caída')}), \
+                mock.patch.object(send_pending_verification_emails, 'max_retries', 0):
+            send_pending_verification_emails.apply(kwargs={'batch_size': 10}, throw=False)
+        statuses = dict(EmailDelivery.objects.values_list('contestant__email', 'status'))
+        self.assertEqual(statuses, {
+            'b1@test.com': EmailDelivery.SENT, 'b2@test.com': EmailDelivery.SENT, 'b3@test.com': EmailDelivery.FAILED,
+        })
+        # b3 y b4 vuelven a la cola; b1 y b2 no se reenvían
+        self.assertEqual(
+            set(EmailVerificationToken.objects.filter(sent_at__isnull=True, used_at__isnull=True)
+                .values_list('contestant__email', flat=True)),
+            {'b3@test.com', 'b4@test.com'},
+        )
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', return_value=0):
+            send_pending_verification_emails.apply()
+        self.assertEqual(
+            EmailDelivery.objects.get(contestant__email='b4@test.com').status, EmailDelivery.FAILED
+        )
+
+
+class EmailTemplateTests(TestCase):
+    def setUp(self):
+        self.contestant = Contestant(
+            first_name='Ana <b>', last_name='Soto', email='ana@test.com', phone='+56912345678'
+        )
+
+    @override_settings(HOTEL_NAME='Hotel Prueba', FRONTEND_URL='https://concurso.test')
+    def test_verificacion_usa_branding_y_escapa_html(self):
+        """El HTML escapa datos del concursante y el contexto de marca sigue a settings"""
+        subject, text, html = render_verification_email(self.contestant, 'abc')
+        self.assertEqual(subject, '[Hotel Prueba] Verifica tu email – Concurso San Valentín')
+        self.assertIn('https://concurso.test/verify?token=abc', html)
+        self.assertIn('Ana &lt;b&gt; Soto', html)
+        self.assertIn('Hola Ana <b> Soto', text)
+        self.assertIn('expira en 2 horas', text)
+
+    def test_ganador(self):
+        subject, text, html = render_winner_email(self.contestant)
+        self.assertIn('Eres el ganador', subject)
+        self.assertIn('Tu premio: 2 noches románticas en nuestro hotel', html)
+        self.assertIn('Escápate con estilo', html)
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'register_ip': '5/min', 'register_email': '2/min', 'verify_ip': '3/min', 'verify_token': '2/min',
+        },
+    },
+)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_registro_limitado_por_email_y_por_ip(self):
+        """Rechaza con 429 antes de tocar la base, por email y por IP"""
+        url = reverse('contest:contestants')
+        data = {'first_name': 'Ana', 'last_name': 'Soto', 'email': 'ana@test.com', 'phone': 'no-valido'}
+        codes = [self.client.post(url, data, format='json').status_code for _ in range(3)]
+        self.assertEqual(codes, [400, 400, 429])
+
+        # Mismo email con otra capitalización cuenta como el mismo
+        data['email'] = ' ANA@test.com'
+        with self.assertNumQueries(0):
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # Otros emails desde la misma IP hasta agotar el cupo por IP (5/min)
+        codes = [
+            self.client.post(url, {**data, 'email': f'otro{i}@test.com'}, format='json').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes, [400, 429, 429])
+
+    def test_x_forwarded_for_no_evade_limite_por_ip(self):
+        """Sin proxies de confianza, un X-Forwarded-For inventado no cambia la IP"""
+        url = reverse('contest:verification')
+        codes = [
+            self.client.post(
+                url, {'token': str(uuid.uuid4()), 'password': 'x', 'password_confirm': 'x'},
+                format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}',
+            ).status_code
+            for i in range(4)
+        ]
+        self.assertEqual(codes, [400, 400, 400, 429])
+
+    def test_verificacion_limitada_y_contadores(self):
+        url = reverse('contest:verification')
+        data = {'token': str(uuid.uuid4()), 'password': 'password123', 'password_confirm': 'password123'}
+        codes = [self.client.post(url, data, format='json').status_code for _ in range(3)]
+        self.assertEqual(codes, [400, 400, 429])
+
+        admin = User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123')
+        self.client.force_authenticate(admin)
+        stats = self.client.get(reverse('contest:admin-throttling')).data['throttling']
+        self.assertEqual(stats['verify_token'], {'allowed': 2, 'blocked': 1})
+        self.assertEqual(stats['verify_ip']['allowed'], 3)
+
+    def test_un_pipeline_redis_por_scope(self):
+        """Con Redis, cada scope permitido suma ventana y estadística en un solo round-trip"""
+        client = mock.MagicMock()
+        with mock.patch('contest.throttling.redis_client', return_value=client):
+            self.client.post(reverse('contest:verification'), {
+                'token': str(uuid.uuid4()), 'password': 'x', 'password_confirm': 'x',
+            }, format='json')
+        pipe = client.pipeline.return_value
+        # verify_ip y verify_token
+        self.assertEqual(pipe.execute.call_count, 2)
+        self.assertEqual(pipe.incr.call_count, 4)
+        self.assertEqual(pipe.expire.call_count, 4)
+
+
+class RegistrationHotPathTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('contest:contestants')
+        self.data = {
+            'first_name': ' Juan ', 'last_name': 'Pérez', 'email': 'Juan@Test.com', 'phone': '+56912345678',
+        }
+
+    def test_registro_sin_select_y_email_via_outbox(self):
+        """Solo INSERTs (concursante, token y outbox), sin tocar el broker en la request"""
+        with CaptureQueriesContext(connection) as ctx, \
+                mock.patch('contest.tasks.send_verification_email.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, self.data, format='json')
+        delay.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statements = [q['sql'].split()[0] for q in ctx.captured_queries]
+        self.assertEqual([s for s in statements if s in ('SELECT', 'INSERT', 'UPDATE')], ['INSERT'] * 3)
+
+        contestant = Contestant.objects.get()
+        self.assertEqual((contestant.first_name, contestant.email), ('Juan', 'juan@test.com'))
+        token = EmailVerificationToken.objects.get()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task_name, 'contest.tasks.send_verification_email')
+        self.assertEqual(message.args, [contestant.id, str(token.token)])
+
+    def test_email_duplicado_por_indice_unico(self):
+        """El duplicado lo detecta el índice único y no deja filas huérfanas"""
+        self.client.post(self.url, self.data, format='json')
+        response = self.client.post(self.url, {**self.data, 'email': 'JUAN@test.com '}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['email'], ['Este correo ya está inscrito en el concurso.'])
+        self.assertEqual(Contestant.objects.count(), 1)
+        self.assertEqual(EmailVerificationToken.objects.count(), 1)
+
+    def test_indice_ignora_mayusculas(self):
+        """lower(email) es único aunque se inserte sin normalizar"""
+        Contestant.objects.create(first_name='A', last_name='B', email='x@test.com', phone='+56912345678')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Contestant.objects.create(first_name='A', last_name='B', email='X@Test.com', phone='+56912345678')
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class OutboxRelayTests(TestCase):
+    def setUp(self):
+        self.contestant = Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678', is_verified=True
+        )
+
+    def test_relay_publica_por_lotes(self):
+        """El relay publica los pendientes y no los repite"""
+        admin = User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123')
+        client = APIClient()
+        client.force_authenticate(admin)
+        client.post(reverse('contest:admin-winner'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.filter(published_at__isnull=True).count(), 1)
+
+        self.assertEqual(relay_outbox(batch_size=1), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@test.com'])
+        self.assertEqual(relay_outbox(), 0)
+
+    def test_relay_deja_pendiente_si_falla_el_broker(self):
+        """Si publicar falla, el mensaje queda pendiente con su error"""
+        ok = OutboxMessage.objects.create(task_name='contest.tasks.send_winner_notification', args=[self.contestant.id])
+        failing = OutboxMessage.objects.create(task_name='contest.tasks.send_winner_notification', args=[0])
+        real_publish = outbox_module._publish
+
+        def publish(message, producer):
+            if message.id == failing.id:
+                raise ConnectionError('broker caído')
+            real_publish(message, producer)
+
+        with mock.patch('contest.outbox._publish', side_effect=publish), \
+                self.assertLogs('contest.outbox', 'WARNING'):
+            self.assertEqual(relay_outbox(), 1)
+
+        ok.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertIsNotNone(ok.published_at)
+        self.assertIsNone(failing.published_at)
+        self.assertEqual(failing.attempts, 1)
+        self.assertIn('broker caído', failing.last_error)
+        self.assertGreater(failing.available_at, timezone.now())
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_mensaje_venenoso_no_bloquea_la_cola(self):
+        """Un mensaje que siempre falla no frena a los siguientes y se descarta al agotar intentos"""
+        poison = OutboxMessage.objects.create(task_name='contest.tasks.send_winner_notification', args=[0])
+        ok = OutboxMessage.objects.create(task_name='contest.tasks.send_winner_notification', args=[self.contestant.id])
+        real_publish = outbox_module._publish
+
+        def publish(message, producer):
+            if message.id == poison.id:
+                raise TypeError('args no serializables')
+            real_publish(message, producer)
+
+        with mock.patch('contest.outbox._publish', side_effect=publish), \
+                self.assertLogs('contest.outbox', 'WARNING'):
+            self.assertEqual(relay_outbox(batch_size=1), 1)
+            # En backoff: la siguiente pasada no lo toma
+            self.assertEqual(relay_outbox(), 0)
+        ok.refresh_from_db()
+        poison.refresh_from_db()
+        self.assertIsNotNone(ok.published_at)
+        self.assertEqual((poison.attempts, poison.failed_at), (1, None))
+
+        OutboxMessage.objects.filter(pk=poison.pk).update(available_at=timezone.now())
+        with mock.patch('contest.outbox._publish', side_effect=publish), \
+                self.assertLogs('contest.outbox', 'ERROR'):
+            relay_outbox()
+        poison.refresh_from_db()
+        self.assertEqual(poison.attempts, 2)
+        self.assertIsNotNone(poison.failed_at)
+
+        OutboxMessage.objects.filter(pk=poison.pk).update(available_at=timezone.now())
+        with mock.patch('contest.outbox._publish', side_effect=publish) as patched:
+            self.assertEqual(relay_outbox(), 0)
+        patched.assert_not_called()
+
+
+@override_settings(
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+)
+class ConcurrentRegistrationTests(TransactionTestCase):
+    THREADS = 8
+    PER_THREAD = 10
+
+    def test_inscripciones_concurrentes(self):
+        """Muchos hilos inscribiendo a la vez no producen 'database is locked'"""
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'wal')
+
+        url = reverse('contest:contestants')
+        results = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(n):
+            client = APIClient()
+            barrier.wait()
+            try:
+                for i in range(self.PER_THREAD):
+                    response = client.post(url, {
+                        'first_name': 'Hilo', 'last_name': str(n),
+                        'email': f'hilo{n}-{i}@test.com', 'phone': '+56912345678',
+                    }, format='json')
+                    results.append(response.status_code)
+                # Email repetido entre hilos: solo uno puede ganar
+                response = client.post(url, {
+                    'first_name': 'Hilo', 'last_name': str(n),
+                    'email': 'repetido@test.com', 'phone': '+56912345678',
+                }, format='json')
+                results.append(response.status_code)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = self.THREADS * self.PER_THREAD
+        self.assertEqual(results.count(status.HTTP_201_CREATED), total + 1)
+        self.assertEqual(results.count(status.HTTP_400_BAD_REQUEST), self.THREADS - 1)
+        self.assertEqual(Contestant.objects.count(), total + 1)
+        self.assertEqual(EmailVerificationToken.objects.count(), total + 1)
+        self.assertEqual(OutboxMessage.objects.count(), total + 1)
+
+
+class PurgeStaleRecordsTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.verified = Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678', is_verified=True
+        )
+        self.pending = Contestant.objects.create(
+            first_name='Luis', last_name='Rojas', email='luis@test.com', phone='+56912345678'
+        )
+        self.stale = Contestant.objects.create(
+            first_name='Eva', last_name='Paz', email='eva@test.com', phone='+56912345678'
+        )
+        Contestant.objects.filter(pk=self.stale.pk).update(created_at=now - timedelta(days=40))
+
+        self.keep = [
+            EmailVerificationToken.objects.create(contestant=self.pending),
+            EmailVerificationToken.objects.create(contestant=self.verified, used_at=now - timedelta(hours=1)),
+        ]
+        for i in range(3):
+            EmailVerificationToken.objects.create(contestant=self.pending, expires_at=now - timedelta(days=3))
+            EmailVerificationToken.objects.create(contestant=self.verified, used_at=now - timedelta(days=3))
+        EmailVerificationToken.objects.create(contestant=self.stale, expires_at=now + timedelta(hours=1))
+
+    def test_borra_en_lotes_respetando_retencion(self):
+        """Borra tokens viejos en lotes y conserva los vigentes o recientes"""
+        result = purge_stale_records(batch_size=2, retention=timedelta(hours=24), unverified_max_age=None)
+        self.assertEqual(result, {'tokens': 6, 'outbox': 0, 'contestants': 0})
+        remaining = set(EmailVerificationToken.objects.values_list('id', flat=True))
+        self.assertTrue({t.id for t in self.keep} <= remaining)
+        self.assertEqual(len(remaining), 3)
+
+    @override_settings(UNVERIFIED_CONTESTANT_MAX_AGE=timedelta(days=30))
+    def test_none_no_borra_concursantes_aunque_haya_setting(self):
+        """unverified_max_age=None no borra; sin argumento se usa el setting"""
+        self.assertEqual(purge_stale_records(unverified_max_age=None)['contestants'], 0)
+        self.assertTrue(Contestant.objects.filter(pk=self.stale.pk).exists())
+        self.assertEqual(purge_stale_records()['contestants'], 1)
+
+    def test_borra_concursantes_sin_verificar_antiguos(self):
+        """Los concursantes sin verificar antiguos se borran con sus tokens"""
+        out = io.StringIO()
+        call_command('purge_tokens', '--unverified-days', '30', '--batch-size', '2', stdout=out)
+        self.assertIn('Borrados 6 tokens, 0 mensajes outbox y 1 concursantes sin verificar', out.getvalue())
+        self.assertFalse(Contestant.objects.filter(pk=self.stale.pk).exists())
+        self.assertEqual(Contestant.objects.count(), 2)
+        self.assertEqual(EmailVerificationToken.objects.count(), 2)
+
+
+@override_settings(RESEND_VERIFICATION_COOLDOWN=60)
+class ResendVerificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('contest:verification-resend')
+        self.contestant = Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678'
+        )
+
+    def test_reutiliza_token_vigente_y_aplica_cooldown(self):
+        """Reusa el token vigente y un segundo clic no encola otro envío"""
+        token = EmailVerificationToken.objects.create(contestant=self.contestant)
+        response = self.client.post(self.url, {'email': ' ANA@test.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(EmailVerificationToken.objects.count(), 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.args, [self.contestant.id, str(token.token)])
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {'email': 'ana@test.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_crea_token_si_no_hay_vigente(self):
+        EmailVerificationToken.objects.create(
+            contestant=self.contestant, expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.client.post(self.url, {'email': 'ana@test.com'}, format='json')
+        self.assertEqual(EmailVerificationToken.objects.count(), 2)
+        newest = EmailVerificationToken.objects.latest('created_at')
+        self.assertEqual(OutboxMessage.objects.get().args, [self.contestant.id, str(newest.token)])
+
+    def test_no_reutiliza_token_por_vencer(self):
+        """Un token al que le quedan segundos no se reenvía: se crea uno nuevo"""
+        expiring = EmailVerificationToken.objects.create(
+            contestant=self.contestant, expires_at=timezone.now() + timedelta(seconds=30)
+        )
+        self.client.post(self.url, {'email': 'ana@test.com'}, format='json')
+        newest = EmailVerificationToken.objects.latest('created_at')
+        self.assertNotEqual(newest.pk, expiring.pk)
+        self.assertEqual(OutboxMessage.objects.get().args, [self.contestant.id, str(newest.token)])
+
+    def test_cache_caido_no_rompe_el_reenvio(self):
+        """Sin cache el cooldown se omite y el reenvío responde igual"""
+        # Solo el cache del cooldown: los throttles siguen con el locmem
+        broken_cache = mock.Mock(**{'add.side_effect': ConnectionError('redis caído')})
+        with mock.patch('contest.views.cache', broken_cache), self.assertLogs('contest.views', 'WARNING'):
+            response = self.client.post(self.url, {'email': 'ana@test.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_no_revela_emails_inexistentes_o_verificados(self):
+        """Responde igual si el correo no existe o ya está verificado, sin encolar nada"""
+        Contestant.objects.filter(pk=self.contestant.pk).update(is_verified=True)
+        for email in ('ana@test.com', 'nadie@test.com'):
+            response = self.client.post(self.url, {'email': email}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}})
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123')
+        self.url = reverse('contest:admin-stats')
+
+    def _register(self, email):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('contest:contestants'), {
+                'first_name': 'Ana', 'last_name': 'Soto', 'email': email, 'phone': '+56912345678',
+            }, format='json')
+
+    def test_contadores_incrementales(self):
+        """Inscripciones y verificaciones incrementan los contadores sin consultar la tabla"""
+        reconcile_stats()
+        self._register('a@test.com')
+        self._register('b@test.com')
+        token = EmailVerificationToken.objects.get(contestant__email='a@test.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('contest:verification'), {
+                'token': str(token.token), 'password': 'Cl4ve-Segura!', 'password_confirm': 'Cl4ve-Segura!',
+            }, format='json')
+
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(self.url).data
+        self.assertFalse(any('contest_contestant' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual((data['registrations'], data['verified'], data['verification_rate']), (2, 1, 0.5))
+        self.assertEqual(len(data['per_hour']), 24)
+        self.assertEqual(data['per_hour'][-1]['registrations'], 2)
+        self.assertEqual(data['per_day'][-1]['verified'], 1)
+
+    def test_reconcilia_si_el_cache_esta_vacio(self):
+        """Sin contadores en cache se recalculan desde la base"""
+        Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='c@test.com', phone='+56912345678',
+            is_verified=True, verified_at=timezone.now(),
+        )
+        self.client.force_authenticate(self.admin)
+        data = self.client.get(self.url).data
+        self.assertEqual((data['registrations'], data['verified']), (1, 1))
+        self.assertEqual(data['per_hour'][-1], {**data['per_hour'][-1], 'registrations': 1, 'verified': 1})
+
+    def test_cache_caido_calcula_desde_la_base(self):
+        """Si el cache no responde el dashboard sale de la base en vez de dar 500"""
+        Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='c@test.com', phone='+56912345678',
+            is_verified=True, verified_at=timezone.now(),
+        )
+        self.client.force_authenticate(self.admin)
+        broken = mock.Mock(**{'get_many.side_effect': ConnectionError('redis caído')})
+        with mock.patch('contest.stats.cache', broken), self.assertLogs('contest.stats', 'WARNING'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['registrations'], response.data['verified']), (1, 1))
+        self.assertEqual(response.data['per_day'][-1]['registrations'], 1)
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class WinnerCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123'))
+        self.url = reverse('contest:admin-winner')
+        Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678', is_verified=True,
+        )
+
+    def _draw(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url)
+
+    def test_get_cacheado_y_condicional(self):
+        """El segundo GET no consulta la base y un cliente al día recibe 304"""
+        self._draw()
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.json(), first.json())
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_sorteo_invalida_el_cache(self):
+        """Un sorteo nuevo reemplaza el 404 cacheado y cambia el ETag"""
+        before = self.client.get(self.url)
+        self.assertEqual(before.status_code, status.HTTP_404_NOT_FOUND)
+        self._draw()
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, status.HTTP_200_OK)
+        self.assertEqual(after.json()['winner']['contestant_email'], 'ana@test.com')
+
+    def test_lectura_vieja_no_pisa_la_invalidacion(self):
+        """Un GET que leyó la base antes del commit del sorteo no deja cacheado el 404"""
+        from . import views
+
+        original = views._build_winner_payload
+
+        def build_then_draw():
+            result = original()
+            # El sorteo hace commit (e invalida) mientras este GET arma su payload
+            self._draw()
+            return result
+
+        with mock.patch.object(views, '_build_winner_payload', build_then_draw):
+            stale = self.client.get(self.url)
+        self.assertEqual(stale.status_code, status.HTTP_404_NOT_FOUND)
+
+        after = self.client.get(self.url)
+        self.assertEqual(after.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(after['ETag'], stale['ETag'])
+
+
+@override_settings(
+    PASSWORD_HASHERS=['contest.hashing.TunedArgon2PasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1,
+)
+class PasswordHashingTests(TestCase):
+    def test_argon2_con_costo_de_settings(self):
+        """El hash usa el costo configurado y el pool acotado produce hashes válidos"""
+        from django.contrib.auth.hashers import check_password, identify_hasher
+
+        with self.settings(PASSWORD_HASH_WORKERS=2):
+            encoded = hash_password('Cl4ve-Segura!')
+        self.assertTrue(encoded.startswith('argon2$argon2id$v=19$m=1024,t=1,p=1$'))
+        self.assertTrue(check_password('Cl4ve-Segura!', encoded))
+
+        # Cambiar el costo marca el hash para re-hashear en el próximo login
+        with self.settings(ARGON2_TIME_COST=2):
+            self.assertTrue(identify_hasher(encoded).must_update(encoded))
+
+    def test_hash_async_no_bloquea_el_loop(self):
+        """ahash_password hashea fuera del event loop"""
+        import asyncio
+        from django.contrib.auth.hashers import check_password
+
+        with self.settings(PASSWORD_HASH_WORKERS=1):
+            encoded = asyncio.run(ahash_password('Cl4ve-Segura!'))
+        self.assertTrue(check_password('Cl4ve-Segura!', encoded))
+
+    def test_validadores_precargados(self):
+        """La lista de contraseñas comunes se carga al arrancar, no en la primera request"""
+        from django.apps import apps
+        from django.contrib.auth import password_validation
+
+        # Simula un arranque en frío: sin validadores cacheados hasta ready()
+        password_validation.get_default_password_validators.cache_clear()
+        apps.get_app_config('contest').ready()
+
+        contestant = Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678'
+        )
+        token = EmailVerificationToken.objects.create(contestant=contestant)
+        common_init = password_validation.CommonPasswordValidator.__init__
+        with mock.patch.object(
+            password_validation, 'get_password_validators', wraps=password_validation.get_password_validators
+        ) as build, mock.patch.object(
+            password_validation.CommonPasswordValidator, '__init__', autospec=True, side_effect=common_init
+        ) as load_common:
+            response = APIClient().post(reverse('contest:verification'), {
+                'token': str(token.token), 'password': 'Cl4ve-Segura!', 'password_confirm': 'Cl4ve-Segura!',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        build.assert_not_called()
+        load_common.assert_not_called()
+
+
+@override_settings(
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'register_email': '2/min'}},
+    PASSWORD_HASHERS=['contest.hashing.TunedArgon2PasswordHasher'],
+    ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1,
+)
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = {
+            'first_name': 'Ana', 'last_name': 'Soto', 'email': 'ana@test.com', 'phone': '+56912345678',
+        }
+
+    async def test_registro_async(self):
+        """Misma respuesta que la view sync; el duplicado se traduce a 400 y el tercer intento a 429"""
+        from django.test import AsyncClient
+
+        client = AsyncClient()
+        url = reverse('contest:contestants-async')
+        response = await client.post(url, self.data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        contestant = await Contestant.objects.aget(pk=response.json()['contestant_id'])
+        self.assertTrue(await EmailVerificationToken.objects.filter(contestant=contestant).aexists())
+        self.assertTrue(await OutboxMessage.objects.filter(args__0=contestant.id).aexists())
+
+        response = await client.post(url, {**self.data, 'email': 'ANA@test.com'}, content_type='application/json')
+        self.assertEqual(response.json(), {'email': ['Este correo ya está inscrito en el concurso.']})
+
+        response = await client.post(url, self.data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    async def test_verificacion_async(self):
+        """Activa la cuenta con aget() y el hash fuera del event loop"""
+        from django.contrib.auth.hashers import check_password
+        from django.test import AsyncClient
+
+        contestant = await Contestant.objects.acreate(**self.data)
+        token = await EmailVerificationToken.objects.acreate(contestant=contestant)
+        client = AsyncClient()
+        url = reverse('contest:verification-async')
+        payload = {'token': str(token.token), 'password': 'Cl4ve-Segura!', 'password_confirm': 'Cl4ve-Segura!'}
+
+        response = await client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()['contestant']['is_verified'])
+        user = await User.objects.aget(username='ana@test.com')
+        self.assertTrue(check_password('Cl4ve-Segura!', user.password))
+
+        # El token ya usado no sirve de nuevo
+        response = await client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.json(), {'token': ['Token de verificación inválido.']})
+
+
+@override_settings(
+    PASSWORD_HASHERS=['contest.hashing.TunedArgon2PasswordHasher'],
+    ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1,
+)
+class LoadHarnessTests(TestCase):
+    def test_generacion_determinista(self):
+        """La misma semilla genera los mismos datos; los verificados tienen User y token usado"""
+        from .loadgen import generate_contestants
+
+        totals = generate_contestants(30, seed=7, batch_size=8, verified_ratio=0.5)
+        first = list(Contestant.objects.order_by('id').values_list('email', 'phone', 'tokens__token'))
+        self.assertEqual(totals['contestants'], 30)
+        domains = {email.rsplit('@', 1)[1] for email, _, _ in first}
+        self.assertTrue(domains <= {'example.com', 'example.net', 'example.org'})
+        verified = Contestant.objects.filter(is_verified=True)
+        self.assertEqual(verified.filter(user__isnull=False).count(), totals['users'])
+        self.assertFalse(EmailVerificationToken.objects.filter(contestant__in=verified, used_at__isnull=True).exists())
+
+        Contestant.objects.all().delete()
+        User.objects.all().delete()
+        generate_contestants(30, seed=7, batch_size=13, verified_ratio=0.5)
+        self.assertEqual(list(Contestant.objects.order_by('id').values_list('email', 'phone', 'tokens__token')), first)
+
+    def test_solo_toma_outbox_propio(self):
+        """Los benchmarks borran sus mensajes outbox y no los reales encolados mientras corren"""
+        from .bench import own_outbox_ids
+        from .tasks import send_verification_email, send_winner_notification
+
+        before = OutboxMessage.objects.create(task_name=send_verification_email.name, args=[1, 'a'])
+        own = OutboxMessage.objects.create(task_name=send_verification_email.name, args=[2, 'b'])
+        OutboxMessage.objects.create(task_name=send_verification_email.name, args=[3, 'c'])
+        OutboxMessage.objects.create(task_name=send_winner_notification.name, args=[2])
+        self.assertEqual(own_outbox_ids(send_verification_email, [1, 2], before.id), [own.id])
+
+    def test_bench_async_views_exige_confirmacion_sin_debug(self):
+        """Sin DEBUG el benchmark no escribe en la base salvo con --allow-live-db"""
+        from django.core.management.base import CommandError
+
+        with self.assertRaises(CommandError):
+            call_command('bench_async_views', requests=1, stdout=io.StringIO())
+        self.assertFalse(Contestant.objects.exists())
+
+    def test_loadtest_reporta_y_limpia(self):
+        """El arnés recorre todos los escenarios sin errores y no deja datos propios"""
+        from .loadgen import generate_contestants
+
+        from django.core.management.base import CommandError
+
+        generate_contestants(20, seed=1)
+        with self.assertRaises(CommandError):
+            call_command('loadtest', requests=1, stdout=io.StringIO())
+
+        # Mensaje real pendiente: el arnés no lo publica ni lo borra
+        real = OutboxMessage.objects.create(
+            task_name='contest.tasks.send_winner_notification', args=[Contestant.objects.first().id]
+        )
+        users = User.objects.count()
+        out = io.StringIO()
+        call_command('loadtest', requests=4, draws=2, page_size=5, allow_live_db=True, stdout=out)
+        output = out.getvalue()
+        for name in (
+            'inscripción', 'emails de verificación', 'verificación', 'listado offset profundo',
+            'listado cursor profundo', 'búsqueda', 'sorteo',
+        ):
+            self.assertIn(name, output)
+        self.assertNotIn('errores=1', output)
+        self.assertIn('p99=', output)
+        self.assertEqual(Contestant.objects.count(), 20)
+        self.assertEqual(User.objects.count(), users)
+        self.assertFalse(WinnerDraw.objects.exists())
+        self.assertEqual(list(OutboxMessage.objects.values_list('id', 'published_at')), [(real.id, None)])
+
+
+@override_settings(REQUEST_PROFILING_SLOW_MS=10_000)
+@modify_settings(MIDDLEWARE={'prepend': 'contest.instrumentation.RequestProfilingMiddleware'})
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123'))
+        Contestant.objects.create(first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678')
+
+    def test_server_timing_y_log(self):
+        """Cuenta queries y tiempos por fase, y los publica en Server-Timing y en el log"""
+        with self.assertLogs('contest.profiling', level='INFO') as logs:
+            response = self.client.get(reverse('contest:admin-contestants'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries", serialize;dur=[\d.]+, total;dur=')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['status'], record['db_queries']), (200, 2))
+        self.assertEqual(record['phases']['serialize']['calls'], 1)
+        self.assertNotIn('queries', record)
+
+    def test_request_lenta_incluye_sql(self):
+        """Sobre el umbral se loguea como warning con el SQL ejecutado"""
+        with self.settings(REQUEST_PROFILING_SLOW_MS=0), self.assertLogs('contest.profiling', level='WARNING') as logs:
+            self.client.post(reverse('contest:contestants'), {
+                'first_name': 'Luis', 'last_name': 'Rojas', 'email': 'luis@test.com', 'phone': '+56912345678',
+            }, format='json')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['slow'])
+        self.assertIn('enqueue', record['phases'])
+        self.assertTrue(any('INSERT INTO "contest_contestant"' in q['sql'] for q in record['queries']))
+
+    def test_streaming_cuenta_queries_al_recorrer(self):
+        """En el export CSV el log sale al terminar el stream e incluye sus queries"""
+        with self.assertLogs('contest.profiling', level='INFO') as logs:
+            response = self.client.get(reverse('contest:admin-contestants-export'))
+            logged_before_stream = len(logs.records)
+            content = b''.join(response.streaming_content)
+        self.assertEqual(logged_before_stream, 0)
+        self.assertIn('ana@test.com', content.decode('utf-8-sig'))
+        self.assertGreaterEqual(json.loads(logs.records[0].getMessage())['db_queries'], 1)
+
+    async def test_cadena_async_sin_adaptar(self):
+        """Bajo ASGI el middleware corre en el event loop y perfila las views async"""
+        import asyncio
+        from django.test import AsyncClient
+        from .instrumentation import RequestProfilingMiddleware
+
+        async def view(request):
+            return None
+
+        self.assertTrue(asyncio.iscoroutinefunction(RequestProfilingMiddleware(view)))
+
+        with self.assertLogs('contest.profiling', level='INFO') as logs:
+            response = await AsyncClient().post(reverse('contest:contestants-async'), {
+                'first_name': 'Luis', 'last_name': 'Rojas', 'email': 'luis@test.com', 'phone': '+56912345678',
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertEqual(json.loads(logs.records[0].getMessage())['status'], 201)
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+    CELERY_BROKER_URL='memory://',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    METRICS_TOKEN='secreto',
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+)
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _metrics(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_contadores_histogramas_y_tareas(self):
+        """Exporta latencia por ruta, contadores del concurso, tareas de Celery y backlog de mail"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('contest:contestants'), {
+                'first_name': 'Ana', 'last_name': 'Soto', 'email': 'ana@test.com', 'phone': '+56912345678',
+            }, format='json')
+        self.client.post(reverse('contest:verification'), {
+            'token': str(uuid.uuid4()), 'password': 'Cl4ve-Segura!', 'password_confirm': 'Cl4ve-Segura!',
+        }, format='json')
+        relay_outbox()
+
+        body = self._metrics()
+        self.assertIn('contest_registrations_total 1\n', body)
+        self.assertIn('contest_token_failures_total{reason="invalid"} 1\n', body)
+        self.assertIn('contest_http_request_duration_seconds_count{route="contest:contestants"} 1\n', body)
+        self.assertIn('contest_http_request_duration_seconds_bucket{route="contest:contestants",le="+Inf"} 1\n', body)
+        self.assertIn(
+            'contest_celery_tasks_total{task="contest.tasks.send_verification_email",state="SUCCESS"} 1\n', body,
+        )
+        self.assertIn('contest_smtp_send_seconds_count{kind="single"} 1\n', body)
+        self.assertIn('contest_outbox_pending 0\n', body)
+        self.assertIn('# TYPE contest_broker_queue_length gauge', body)
+
+    def test_token_de_metricas(self):
+        """Con METRICS_TOKEN definido se exige el Bearer token; sin token solo responde con DEBUG"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.settings(METRICS_TOKEN=''):
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+            with self.settings(DEBUG=True):
+                self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+    def test_histograma_en_un_pipeline_redis(self):
+        """Con Redis, una observación son 3 INCRBY en un solo round-trip"""
+        from .metrics import REQUEST_SECONDS
+
+        client = mock.MagicMock()
+        with mock.patch('contest.metrics._redis_client', return_value=client):
+            REQUEST_SECONDS.observe(0.02, route='contest:contestants')
+        pipe = client.pipeline.return_value
+        self.assertEqual(pipe.incrby.call_count, 3)
+        pipe.execute.assert_called_once_with()
+
+    async def test_async_no_escribe_en_el_event_loop(self):
+        """Bajo ASGI las escrituras de métricas (middleware y views async) van fuera del event loop"""
+        from django.test import AsyncClient
+
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def record(*increments):
+            threads.append(threading.get_ident())
+
+        with mock.patch('contest.metrics._incr', record):
+            response = await AsyncClient().post(reverse('contest:verification-async'), {
+                'token': str(uuid.uuid4()), 'password': 'Cl4ve-Segura!', 'password_confirm': 'Cl4ve-Segura!',
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Falla de token + latencia de la request
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class MailTaskTests(TestCase):
+    def setUp(self):
+        self.contestant = Contestant.objects.create(
+            first_name='Ana', last_name='Soto', email='ana@test.com', phone='+56912345678',
+        )
+
+    def test_colas_separadas(self):
+        """Ganador y verificaciones van a colas distintas, sin guardar resultados"""
+        from celery import current_app
+        from .tasks import send_verification_email, send_winner_notification
+
+        router = current_app.amqp.router
+        self.assertEqual(router.route({}, send_winner_notification.name)['queue'].name, 'mail_winner')
+        self.assertEqual(router.route({}, send_verification_email.name)['queue'].name, 'mail_verification')
+        self.assertTrue(send_winner_notification.ignore_result)
+        self.assertTrue(send_winner_notification.acks_late)
+
+    def test_error_smtp_transitorio_se_reintenta(self):
+        """Un error SMTP se reintenta (antes se perdía con un print)"""
+        from smtplib import SMTPServerDisconnected
+        from .tasks import send_winner_notification
+
+        calls = []
+
+        def flaky_send(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) == 1:
+                raise SMTPServerDisconnected('conexión cerrada')
+            return 1
+
+        # apply() sin propagar: el reintento se ejecuta en el acto (sin countdown)
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', flaky_send):
+            result = send_winner_notification.apply((self.contestant.id,), throw=False)
+        self.assertEqual(result.state, 'SUCCESS')
+        self.assertEqual(len(calls), 2)
+        delivery = EmailDelivery.objects.get(kind=EmailDelivery.WINNER, contestant=self.contestant)
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), (EmailDelivery.SENT, 2, ''))
+
+    def test_destinatario_rechazado_queda_fallido(self):
+        """Un rechazo del destinatario no se reintenta y queda como fallido"""
+        from smtplib import SMTPRecipientsRefused
+        from .tasks import send_winner_notification
+
+        error = SMTPRecipientsRefused({'ana@test.com': (550, b'no existe')})
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=error):
+            result = send_winner_notification.apply((self.contestant.id,), throw=False)
+        self.assertEqual(result.state, 'FAILURE')
+        delivery = EmailDelivery.objects.get(contestant=self.contestant)
+        self.assertEqual((delivery.status, delivery.attempts), (EmailDelivery.FAILED, 1))
+
+    def test_reencolar_fallidos_desde_el_admin(self):
+        """La acción del admin reencola en lote, con token nuevo si el original venció"""
+        expired = EmailVerificationToken.objects.create(
+            contestant=self.contestant, expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        delivery = EmailDelivery.objects.create(
+            kind=EmailDelivery.VERIFICATION, contestant=self.contestant, reference=str(expired.token),
+            status=EmailDelivery.FAILED, attempts=6, last_error='timeout',
+        )
+        winner = EmailDelivery.objects.create(
+            kind=EmailDelivery.WINNER, contestant=self.contestant, status=EmailDelivery.FAILED, attempts=1,
+        )
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.com', 'adminpass123'))
+        self.client.post(reverse('admin:contest_emaildelivery_changelist'), {
+            'action': 'requeue', '_selected_action': [delivery.id, winner.id],
+        })
+
+        # El envío del token vencido conserva su historial; el reenvío es otra fila
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), (EmailDelivery.FAILED, 6, 'timeout'))
+        resent = EmailDelivery.objects.get(kind=EmailDelivery.VERIFICATION, status=EmailDelivery.PENDING)
+        self.assertFalse(EmailVerificationToken.objects.get(token=resent.reference).is_expired())
+        winner.refresh_from_db()
+        self.assertEqual(winner.status, EmailDelivery.PENDING)
+        self.assertEqual(
+            sorted((m.task_name.rsplit('.', 1)[-1], m.args) for m in OutboxMessage.objects.all()),
+            [('send_verification_email', [self.contestant.id, resent.reference]),
+             ('send_winner_notification', [self.contestant.id])],
+        )
+
+        # Al publicarse, el envío queda registrado como enviado
+        relay_outbox()
+        resent.refresh_from_db()
+        self.assertEqual((resent.status, resent.attempts), (EmailDelivery.SENT, 1))
+
+    def test_reencolar_con_fila_existente_del_token_vigente(self):
+        """Si ya hay una fila para el token vigente se reutiliza (sin violar la unicidad)"""
+        from .deliveries import requeue_deliveries
+
+        expired = EmailVerificationToken.objects.create(
+            contestant=self.contestant, expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        current = EmailVerificationToken.objects.create(contestant=self.contestant)
+        failed = EmailDelivery.objects.create(
+            kind=EmailDelivery.VERIFICATION, contestant=self.contestant, reference=str(expired.token),
+            status=EmailDelivery.FAILED, attempts=3,
+        )
+        sent = EmailDelivery.objects.create(
+            kind=EmailDelivery.VERIFICATION, contestant=self.contestant, reference=str(current.token),
+            status=EmailDelivery.SENT, attempts=1,
+        )
+        self.assertEqual(requeue_deliveries(EmailDelivery.objects.filter(pk=failed.pk)), 1)
+        self.assertEqual(EmailDelivery.objects.count(), 2)
+        sent.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual((sent.status, sent.attempts), (EmailDelivery.PENDING, 1))
+        self.assertEqual(failed.status, EmailDelivery.FAILED)
+        self.assertEqual(OutboxMessage.objects.get().args, [self.contestant.id, str(current.token)])
+
+    def test_concursante_inexistente_no_reintenta(self):
+        """Si el concursante ya no existe se registra y termina, sin reintentos"""
+        from .tasks import send_verification_email
+
+        with self.assertLogs('contest.tasks', level='WARNING'), \
+                mock.patch.object(send_verification_email, 'retry') as retry:
+            send_verification_email.delay(999999, str(uuid.uuid4()))
+        retry.assert_not_called()
+        self.assertEqual(len(mail.outbox), 0)
@@ -0,0 +1,166 @@
+import logging
+import time
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .caching import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "throttle:stats:{scope}:{outcome}"
+# Las estadísticas se conservan una semana desde el último incremento
+STATS_TIMEOUT = 7 * 24 * 3600
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Throttle de ventana deslizante aproximada sobre el cache (Redis).
+
+    Guarda un contador por ventana fija y estima la ventana deslizante como
+    contador_actual + contador_anterior * fracción no transcurrida. Son dos
+    claves por identidad (en vez del historial de timestamps de DRF), una
+    lectura get_many y, en Redis, un pipeline con el incremento de la ventana
+    y el de las estadísticas: dos round-trips por scope, y se rechaza antes de
+    tocar la base o el serializer. Si el cache no responde, deja pasar la
+    request (fail-open).
+
+    Las subclases definen scope y get_ident_key(); la tasa sale de
+    REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope].
+    """
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def get_rate(self):
+        # Se lee en cada request (y no al importar) para respetar override_settings;
+        # un scope sin tasa configurada queda sin límite.
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request)
+        if not ident:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        elapsed = (now % self.duration) / self.duration
+        current_key = f"{key}:{window}"
+        previous_key = f"{key}:{window - 1}"
+        try:
+            counts = self.cache.get_many([current_key, previous_key])
+            estimated = counts.get(current_key, 0) + counts.get(previous_key, 0) * (1 - elapsed)
+            if estimated >= self.num_requests:
+                self._wait = (1 - elapsed) * self.duration
+                record_throttle_event(self.cache, self.scope, "blocked")
+                return False
+            _incr_with_timeout(self.cache, [
+                (current_key, 2 * self.duration),
+                (STATS_KEY.format(scope=self.scope, outcome="allowed"), STATS_TIMEOUT),
+            ])
+        except Exception as exc:
+            logger.warning("Throttle %s sin cache, se deja pasar: %s", self.scope, exc)
+        return True
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
+
+
+class TokenThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request):
+        token = request.data.get("token") if hasattr(request.data, "get") else None
+        if not isinstance(token, str) or not token.strip():
+            return None
+        return token.strip().lower()
+
+
+class RegistrationIPThrottle(IPThrottle):
+    scope = "register_ip"
+
+
+class RegistrationEmailThrottle(EmailThrottle):
+    scope = "register_email"
+
+
+class VerificationIPThrottle(IPThrottle):
+    scope = "verify_ip"
+
+
+class VerificationTokenThrottle(TokenThrottle):
+    # La verificación no recibe email: se limita por token
+    scope = "verify_token"
+
+
+class ResendIPThrottle(IPThrottle):
+    scope = "resend_ip"
+
+
+class ResendEmailThrottle(EmailThrottle):
+    scope = "resend_email"
+
+
+def _incr_with_timeout(cache, increments):
+    """
+    Suma 1 a cada (clave, timeout) del cache.
+
+    En Redis va un solo pipeline de INCR + EXPIRE (un round-trip; el incr de
+    Django haría EXISTS + INCRBY por clave), y cada incremento renueva la
+    expiración. En otros backends se hace add y, si la clave existe, incr.
+    """
+    client = redis_client(cache)
+    if client is not None:
+        pipe = client.pipeline(transaction=False)
+        for key, timeout in increments:
+            redis_key = cache.make_and_validate_key(key)
+            pipe.incr(redis_key)
+            pipe.expire(redis_key, timeout)
+        pipe.execute()
+        return
+    for key, timeout in increments:
+        if not cache.add(key, 1, timeout):
+            cache.incr(key)
+
+
+def record_throttle_event(cache, scope, outcome):
+    _incr_with_timeout(cache, [(STATS_KEY.format(scope=scope, outcome=outcome), STATS_TIMEOUT)])
+
+
+def throttle_stats(cache, scopes):
+    """
+    Lee los contadores de requests permitidas/rechazadas por scope.
+
+    Returns:
+        dict: {scope: {"allowed": int, "blocked": int}}
+    """
+    keys = {
+        (scope, outcome): STATS_KEY.format(scope=scope, outcome=outcome)
+        for scope in scopes
+        for outcome in ("allowed", "blocked")
+    }
+    values = cache.get_many(list(keys.values()))
+    stats = {scope: {"allowed": 0, "blocked": 0} for scope in scopes}
+    for (scope, outcome), key in keys.items():
+        stats[scope][outcome] = values.get(key, 0)
+    return stats
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'contest'
 
@@ -7,8 +7,19 @@ urlpatterns = [
     # Endpoints públicos
     path('contestants/', views.register_contestant, name='contestants'),
     path('verification/', views.verify_email_and_set_password, name='verification'),
+    path('verification/resend/', views.resend_verification_email, name='verification-resend'),
+
+    # Variantes async de los endpoints públicos (servir con ASGI)
+    path('async/contestants/', async_views.aregister_contestant, name='contestants-async'),
+    path('async/verification/', async_views.averify_email_and_set_password, name='verification-async'),
     
     # Endpoints admin
     path('admin/contestants/', views.list_contestants, name='admin-contestants'),
+    path('admin/contestants/export/', views.export_contestants, name='admin-contestants-export'),
+    path('admin/contestants/import/', views.import_contestants_view, name='admin-contestants-import'),
     path('admin/winner/', views.winner_view, name='admin-winner'),
+    path('admin/stats/', views.stats_view, name='admin-stats'),
+    path('admin/throttling/', views.throttling_stats_view, name='admin-throttling'),
+    path('admin/campaigns/', views.campaigns_view, name='admin-campaigns'),
+    path('admin/campaigns/<slug:slug>/draw/', views.campaign_draw_view, name='admin-campaign-draw'),
 ]
@@ -1,3 +1,6 @@
+import unicodedata
+
+
 def normalize_contestant_fields(attrs):
     """
     Normaliza los campos de entrada de un concursante.
@@ -22,3 +25,37 @@ def normalize_contestant_fields(attrs):
         attrs["phone"] = attrs["phone"].strip()
         
     return attrs
+
+
+def fold_search_text(value):
+    """
+    Pasa un texto a minúsculas y sin tildes para búsquedas.
+
+    Args:
+        value (str): Texto original
+
+    Returns:
+        str: Texto normalizado, ej: "Pérez Núñez" -> "perez nunez"
+    """
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def build_contestant_search_text(first_name, last_name, second_last_name, email):
+    """Arma la columna desnormalizada de búsqueda de un concursante"""
+    return fold_search_text(" ".join(
+        part for part in (first_name, last_name, second_last_name, email) if part
+    ))
+
+
+def search_contestants(queryset, term):
+    """
+    Filtra concursantes por la columna search_text.
+
+    Cada palabra del término debe aparecer (AND); la comparación es sin
+    tildes ni mayúsculas y usa el índice trigram en Postgres.
+    """
+    for word in fold_search_text(term).split():
+        queryset = queryset.filter(search_text__contains=word)
+    return queryset
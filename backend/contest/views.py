@@ -1,35 +1,59 @@
+import io
+import logging
+
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
-from django.db.models import Q
-from django.db.models.functions import Random
-from .models import Contestant, EmailVerificationToken, WinnerDraw
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from . import metrics, outbox
+from .models import Campaign, Contestant, WinnerDraw
 from .serializers import (
+    CampaignSerializer,
     ContestantRegistrationSerializer,
     EmailVerificationSerializer,
     ContestantSerializer,
+    ResendVerificationSerializer,
     WinnerDrawSerializer
 )
-from .tasks import send_verification_email, send_winner_notification
-from .utils import normalize_contestant_fields
+from .caching import WINNER_CACHE_KEY, apply_validators, cached_payload, not_modified
+from .draw import draw_campaign, draw_contestant, new_seed
+from .exporters import build_contestants_xlsx, stream_contestants_csv
+from .importer import import_contestants
+from .listing import contestant_rows, render_contestant_rows
+from .stats import dashboard_stats
+from .tasks import send_winner_notification
+from .throttling import (
+    RegistrationEmailThrottle,
+    RegistrationIPThrottle,
+    ResendEmailThrottle,
+    ResendIPThrottle,
+    VerificationIPThrottle,
+    VerificationTokenThrottle,
+    throttle_stats,
+)
+from .utils import search_contestants
+from .pagination import COUNT_MODES, count_queryset, decode_cursor, paginate_by_cursor
+
+logger = logging.getLogger(__name__)
 
 
 # Endpoints públicos
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([RegistrationIPThrottle, RegistrationEmailThrottle])
 def register_contestant(request):
     """Inscripción al concurso"""
-    data = normalize_contestant_fields(request.data.copy())
-    
-    serializer = ContestantRegistrationSerializer(data=data)
+    serializer = ContestantRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         contestant = serializer.save()
-        
-        token = EmailVerificationToken.objects.create(contestant=contestant)
-        send_verification_email.delay(contestant.id, str(token.token))
-        
+
         return Response({
             'message': '¡Gracias por registrarte! Revisa tu correo para verificar tu cuenta.',
             'contestant_id': contestant.id
@@ -40,6 +64,7 @@ def register_contestant(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([VerificationIPThrottle, VerificationTokenThrottle])
 def verify_email_and_set_password(request):
     """Verificar email y crear contraseña"""
     serializer = EmailVerificationSerializer(data=request.data)
@@ -54,48 +79,183 @@ def verify_email_and_set_password(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([ResendIPThrottle, ResendEmailThrottle])
+def resend_verification_email(request):
+    """Reenviar el email de verificación (con cooldown por correo)"""
+    serializer = ResendVerificationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Cooldown en cache antes de tocar la base: clics repetidos no reenvían.
+    # Si el cache no responde se deja pasar (quedan los throttles por IP/email).
+    email = serializer.validated_data['email']
+    cooldown = settings.RESEND_VERIFICATION_COOLDOWN
+    try:
+        cooling_down = not cache.add(f'resend:cooldown:{email}', 1, cooldown)
+    except Exception as exc:
+        logger.warning("Reenvío sin cache para el cooldown, se deja pasar: %s", exc)
+        cooling_down = False
+    if cooling_down:
+        return Response({
+            'error': 'Ya enviamos un enlace hace poco. Revisa tu correo o inténtalo en unos minutos.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(cooldown)})
+
+    serializer.resend()
+    return Response({
+        'message': 'Si el correo está inscrito y pendiente de verificación, te enviaremos un nuevo enlace.'
+    }, status=status.HTTP_200_OK)
+
+
 # Endpoints admin
 
-@api_view(['GET'])
-@permission_classes([IsAdminUser])
-def list_contestants(request):
-    """Listar concursantes con paginación y filtros"""
-    contestants = Contestant.objects.all().order_by('-created_at')
-    
+def _filter_contestants(request):
+    """
+    Aplica los filtros ?verified= y ?search= del listado admin.
+
+    Returns:
+        tuple: (queryset ordenado por fecha descendente, si se aplicó algún filtro)
+    """
+    contestants = Contestant.objects.all().order_by('-created_at', '-id')
+    filtered = False
+
     verified = request.GET.get('verified')
-    if verified is not None and verified.strip():  
+    if verified is not None and verified.strip():
         contestants = contestants.filter(is_verified=verified.lower() == 'true')
-    
+        filtered = True
+
     search = request.GET.get('search')
     if search:
-        contestants = contestants.filter(
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(second_last_name__icontains=search) |
-            Q(email__icontains=search)
-        )
-    
+        contestants = search_contestants(contestants, search)
+        filtered = True
+
+    return contestants, filtered
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def list_contestants(request):
+    """Listar concursantes con paginación (offset o cursor) y filtros"""
+    contestants, filtered = _filter_contestants(request)
+
+    count_mode = request.GET.get('count', '').strip().lower()
+
     try:
-        page = int(request.GET.get('page', 1))
         page_size = int(request.GET.get('page_size', 50))
     except ValueError:
-        page, page_size = 1, 50
+        page_size = 50
+    page_size = max(min(page_size, 200), 1)
+
+    # Modo cursor (keyset): opt-in con ?pagination=cursor o enviando ?cursor=
+    cursor_param = request.GET.get('cursor')
+    if cursor_param is not None or request.GET.get('pagination') == 'cursor':
+        cursor = None
+        if cursor_param:
+            cursor = decode_cursor(cursor_param)
+            if cursor is None:
+                return Response({'error': 'Cursor inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        if count_mode not in COUNT_MODES:
+            count_mode = 'none'
+        rows, next_cursor, prev_cursor = paginate_by_cursor(contestant_rows(contestants), cursor, page_size)
+        total, is_estimate = count_queryset(contestants, count_mode, filtered)
+        return Response({
+            'count': total,
+            'count_is_estimate': is_estimate,
+            'page_size': page_size,
+            'next': next_cursor,
+            'prev': prev_cursor,
+            'contestants': render_contestant_rows(rows)
+        })
+
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
     page = max(page, 1)
-    page_size = max(min(page_size, 200), 1)  
     start = (page - 1) * page_size
     end = start + page_size
-    
-    total = contestants.count()
-    serializer = ContestantSerializer(contestants[start:end], many=True)
-    
+
+    if count_mode not in COUNT_MODES:
+        count_mode = 'exact'
+    total, is_estimate = count_queryset(contestants, count_mode, filtered)
+    # Camino rápido: dicts de .values() con full_name en SQL, sin ContestantSerializer
+    rows = contestant_rows(contestants)[start:end]
+
     return Response({
         'count': total,
+        'count_is_estimate': is_estimate,
         'page': page,
         'page_size': page_size,
-        'contestants': serializer.data
+        'contestants': render_contestant_rows(rows)
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_contestants(request):
+    """Exportar concursantes filtrados como CSV (por defecto) o XLSX, en streaming"""
+    contestants, _ = _filter_contestants(request)
+    file_type = request.GET.get('file_type', 'csv').lower()
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+
+    if file_type == 'csv':
+        response = StreamingHttpResponse(stream_contestants_csv(contestants), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="concursantes-{stamp}.csv"'
+        return response
+
+    if file_type == 'xlsx':
+        try:
+            workbook = build_contestants_xlsx(contestants)
+        except ImportError:
+            return Response({'error': 'Exportación XLSX no disponible (falta openpyxl).'}, status=status.HTTP_400_BAD_REQUEST)
+        return FileResponse(
+            workbook, as_attachment=True, filename=f'concursantes-{stamp}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    return Response({'error': 'Formato no soportado, use csv o xlsx.'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_contestants_view(request):
+    """Importar concursantes desde un archivo CSV/JSONL (campo 'file')"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Debe adjuntar un archivo en el campo "file".'}, status=status.HTTP_400_BAD_REQUEST)
+
+    fmt = request.data.get('file_format') or ('jsonl' if upload.name.lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        return Response({'error': 'Formato no soportado, use csv o jsonl.'}, status=status.HTTP_400_BAD_REQUEST)
+    send_emails = str(request.data.get('send_emails', '')).lower() in ('1', 'true')
+
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    result = import_contestants(stream, fmt, send_emails=send_emails)
+    return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stats_view(request):
+    """Estadísticas del dashboard (contadores en cache, sin COUNT sobre la tabla)"""
+    return Response(dashboard_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def throttling_stats_view(request):
+    """Contadores de requests permitidas/rechazadas por los throttles públicos"""
+    scopes = [
+        throttle.scope for throttle in (
+            RegistrationIPThrottle, RegistrationEmailThrottle,
+            VerificationIPThrottle, VerificationTokenThrottle,
+            ResendIPThrottle, ResendEmailThrottle,
+        )
+    ]
+    return Response({'throttling': throttle_stats(cache, scopes)})
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdminUser])
 def winner_view(request):
@@ -104,24 +264,25 @@ def winner_view(request):
     POST: Sortear ganador (solo uno permitido)
     """
     if request.method == 'POST':
-        # Verificar que no haya ganador previo
-        if WinnerDraw.objects.exists():
+        # Verificar que no haya ganador previo (sorteo único, sin campaña)
+        if WinnerDraw.objects.filter(campaign__isnull=True).exists():
             return Response({
                 'error': 'Ya se ha realizado el sorteo. Solo se permite un ganador.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Seleccionar ganador aleatorio
-        winner = Contestant.objects.filter(is_verified=True).order_by(Random()).first()
+        # Seleccionar ganador aleatorio (semilla registrada para auditoría)
+        seed = new_seed()
+        winner = draw_contestant(seed)
         if not winner:
             return Response({
                 'error': 'No hay concursantes verificados para el sorteo.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Crear registro del sorteo
-        winner_draw = WinnerDraw.objects.create(contestant=winner)
-        
-        # Enviar email al ganador (asíncrono)
-        send_winner_notification.delay(winner.id)
+        # Crear registro del sorteo y encolar el email al ganador (vía outbox)
+        with transaction.atomic():
+            winner_draw = WinnerDraw.objects.create(contestant=winner, seed=seed)
+            outbox.enqueue(send_winner_notification, winner.id)
+        metrics.DRAWS.inc(kind='single')
         
         return Response({
             'message': f'¡Ganador seleccionado! {winner.full_name}',
@@ -129,12 +290,97 @@ def winner_view(request):
         }, status=status.HTTP_201_CREATED)
     
     elif request.method == 'GET':
-        try:
-            winner = WinnerDraw.objects.select_related('contestant').latest('drawn_at')
-            return Response({
-                'winner': WinnerDrawSerializer(winner).data
-            })
-        except WinnerDraw.DoesNotExist:
-            return Response({
-                'message': 'Aún no se ha realizado el sorteo.'
-            }, status=status.HTTP_404_NOT_FOUND)
+        # Payload cacheado hasta el próximo sorteo; los polls cuestan un hit o un 304
+        payload = cached_payload(WINNER_CACHE_KEY, _build_winner_payload)
+        if not_modified(request, payload):
+            return apply_validators(Response(status=status.HTTP_304_NOT_MODIFIED), payload)
+        return apply_validators(Response(payload['data'], status=payload['status']), payload)
+
+
+def _build_winner_payload():
+    try:
+        winner = WinnerDraw.objects.filter(campaign__isnull=True).select_related('contestant').latest('drawn_at')
+    except WinnerDraw.DoesNotExist:
+        return status.HTTP_404_NOT_FOUND, {'message': 'Aún no se ha realizado el sorteo.'}, None
+    return status.HTTP_200_OK, {'winner': WinnerDrawSerializer(winner).data}, winner.drawn_at
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def campaigns_view(request):
+    """
+    GET: Listar campañas
+    POST: Crear campaña
+    """
+    if request.method == 'POST':
+        serializer = CampaignSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'campaigns': CampaignSerializer(Campaign.objects.all(), many=True).data
+    })
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def campaign_draw_view(request, slug):
+    """
+    GET: Ver ganadores y suplentes de una campaña
+    POST: Sortear ganadores y suplentes (una vez por campaña)
+    """
+    campaign = get_object_or_404(Campaign, slug=slug)
+
+    if request.method == 'POST':
+        with transaction.atomic():
+            # Bloquea la campaña para que dos sorteos simultáneos no se pisen
+            campaign = Campaign.objects.select_for_update().get(pk=campaign.pk)
+            if campaign.draws.exists():
+                return Response({
+                    'error': 'Ya se ha realizado el sorteo de esta campaña.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            seed = new_seed()
+            draws = draw_campaign(campaign, seed)
+            if not draws:
+                return Response({
+                    'error': 'No hay concursantes verificados para el sorteo.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Notifica solo a los ganadores, los suplentes quedan en espera
+            outbox.enqueue_many(send_winner_notification, [
+                (draw.contestant_id,) for draw in draws if not draw.is_alternate
+            ])
+        metrics.DRAWS.inc(kind='campaign')
+
+        return Response({
+            'message': f'¡Sorteo realizado! {len(draws)} concursantes seleccionados.',
+            'seed': seed,
+            'draws': WinnerDrawSerializer(draws, many=True).data
+        }, status=status.HTTP_201_CREATED)
+
+    draws = campaign.draws.select_related('contestant').order_by('position')
+    return Response({
+        'campaign': CampaignSerializer(campaign).data,
+        'draws': WinnerDrawSerializer(draws, many=True).data
+    })
+
+
+# Métricas (formato Prometheus)
+
+def metrics_view(request):
+    """
+    Exporta el registro local de métricas en formato de texto de Prometheus.
+
+    Es una view de Django (no DRF) para no pasar por la negociación de
+    contenido. Si METRICS_TOKEN está definido se exige como Bearer token; sin
+    token solo se sirve con DEBUG (en producción responde 404).
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        raise Http404
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(metrics.render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -12,8 +12,10 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from datetime import timedelta
 from dotenv import load_dotenv
+from kombu import Queue
 
 load_dotenv()
 
@@ -29,6 +31,9 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 # Branding
 HOTEL_NAME = "Hotel Mirador del Lago"
+HOTEL_TAGLINE = "Escápate con estilo"
+BRAND_COLOR = "#e91e63"
+CONTEST_PRIZE = "2 noches románticas en nuestro hotel"
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -55,6 +60,21 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Métricas en /metrics: latencia por ruta (middleware), contadores y tareas de Celery,
+# guardadas en el cache para sumar todos los procesos. METRICS_TOKEN (Bearer) protege
+# el endpoint; sin token /metrics solo responde con DEBUG=1.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "contest.metrics.MetricsMiddleware")
+
+# Perfilado por request (opt-in): header Server-Timing + log JSON en contest.profiling,
+# con el SQL de las requests que superan REQUEST_PROFILING_SLOW_MS
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "0") == "1"
+REQUEST_PROFILING_SLOW_MS = int(os.getenv("REQUEST_PROFILING_SLOW_MS", "500"))
+if REQUEST_PROFILING:
+    MIDDLEWARE.insert(0, "contest.instrumentation.RequestProfilingMiddleware")
+
 ROOT_URLCONF = "cts_valentine.urls"
 
 TEMPLATES = [{
@@ -71,13 +91,73 @@ TEMPLATES = [{
 
 WSGI_APPLICATION = "cts_valentine.wsgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Base de datos: DB_ENGINE=sqlite (por defecto) o postgres
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "cts_valentine"),
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            # Conexiones persistentes, verificadas antes de reutilizarse. El pool
+            # nativo (OPTIONS["pool"]) llega con Django 5.1; con 5.0 se usa
+            # CONN_MAX_AGE o un pooler externo (PgBouncer).
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            # Segundos que una escritura espera el lock antes de "database is locked"
+            "OPTIONS": {"timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "20"))},
+            # Tests en archivo para que WAL y los tests de concurrencia apliquen
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+        }
     }
+else:
+    raise ValueError(f"DB_ENGINE no soportado: {DB_ENGINE}")
+
+# PRAGMAs que contest.signals aplica a cada conexión SQLite nueva
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(float(os.getenv("SQLITE_BUSY_TIMEOUT", "20")) * 1000),
 }
 
+# Hasher de contraseñas: argon2 (requiere argon2-cffi) o pbkdf2 (default de Django).
+# Los demás quedan en la lista para verificar hashes existentes y actualizarlos al login.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "argon2")
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "contest.hashing.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if PASSWORD_HASHER == "argon2":
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        PASSWORD_HASHER = "pbkdf2"
+    else:
+        PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(2))
+elif PASSWORD_HASHER != "pbkdf2":
+    raise ValueError(f"PASSWORD_HASHER no soportado: {PASSWORD_HASHER}")
+
+# Costo de Argon2 (memory_cost en KiB); subirlo solo tras medir con bench_hashers
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "102400"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "8"))
+# Hilos dedicados a hashear contraseñas (0 = en el hilo de la request). Acota la
+# memoria de Argon2 bajo carga y evita bloquear el event loop en ASGI.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -102,6 +182,19 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
+    # Ventanas deslizantes de contest.throttling (por IP y por email/token)
+    "DEFAULT_THROTTLE_RATES": {
+        "register_ip": os.getenv("THROTTLE_REGISTER_IP", "30/hour"),
+        "register_email": os.getenv("THROTTLE_REGISTER_EMAIL", "5/hour"),
+        "verify_ip": os.getenv("THROTTLE_VERIFY_IP", "30/hour"),
+        "verify_token": os.getenv("THROTTLE_VERIFY_TOKEN", "10/hour"),
+        "resend_ip": os.getenv("THROTTLE_RESEND_IP", "20/hour"),
+        "resend_email": os.getenv("THROTTLE_RESEND_EMAIL", "5/hour"),
+    },
+    # Proxies de confianza delante de Django. Con 0 los throttles por IP usan
+    # REMOTE_ADDR e ignoran X-Forwarded-For (que el cliente puede falsificar);
+    # detrás de un balanceador/nginx, poner la cantidad de saltos (p. ej. 1).
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
 SIMPLE_JWT = {
@@ -129,3 +222,102 @@ DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 # Celery / Redis
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+# Nadie lee los resultados: no se escriben en el backend
+CELERY_TASK_IGNORE_RESULT = True
+
+# Colas separadas para que el email al ganador no espere detrás de la cola de
+# verificaciones. Correr un worker dedicado por cola de mail, ej:
+#   celery -A cts_valentine worker -Q mail_winner -c 2
+#   celery -A cts_valentine worker -Q mail_verification -c 8
+#   celery -A cts_valentine worker -Q default
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = (
+    Queue("default"),
+    Queue("mail_winner"),
+    Queue("mail_verification"),
+)
+CELERY_TASK_ROUTES = {
+    "contest.tasks.send_winner_notification": {"queue": "mail_winner"},
+    "contest.tasks.send_verification_email": {"queue": "mail_verification"},
+    "contest.tasks.send_pending_verification_emails": {"queue": "mail_verification"},
+}
+# El mensaje se confirma al terminar la tarea (si el worker muere se reentrega)
+# y cada proceso reserva un solo mensaje a la vez: las tareas de mail son
+# lentas y no deben quedar retenidas en un worker ocupado.
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Reintentos de los envíos SMTP: backoff exponencial con jitter hasta este tope
+MAIL_TASK_MAX_RETRIES = int(os.getenv("MAIL_TASK_MAX_RETRIES", "6"))
+MAIL_TASK_RETRY_BACKOFF_MAX = int(os.getenv("MAIL_TASK_RETRY_BACKOFF_MAX", "600"))
+
+# Cache (mismo Redis que Celery, otra base). CACHE_URL=locmem:// para desarrollo sin Redis.
+# Los tests (manage.py test) siempre usan locmem: no tocan el Redis del desarrollador.
+TESTING = sys.argv[1:2] == ["test"]
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/2")
+if CACHE_URL.startswith(("redis://", "rediss://")) and not TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "OPTIONS": {"socket_connect_timeout": 0.5, "socket_timeout": 0.5},
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Paginación admin: tope del COUNT(*) en modo ?count=approx
+CONTEST_COUNT_CAP = int(os.getenv("CONTEST_COUNT_CAP", "10000"))
+
+# Segundos entre reenvíos del email de verificación a un mismo correo
+RESEND_VERIFICATION_COOLDOWN = int(os.getenv("RESEND_VERIFICATION_COOLDOWN", "120"))
+# El reenvío solo reutiliza un token si le queda al menos este tiempo de vida
+RESEND_TOKEN_MIN_LIFETIME = timedelta(minutes=int(os.getenv("RESEND_TOKEN_MIN_LIFETIME_MINUTES", "30")))
+
+# Emails de verificación por lotes: con VERIFICATION_EMAIL_BATCHING=1 la
+# inscripción no encola un envío por persona y celery beat drena la cola
+# pendiente cada VERIFICATION_EMAIL_BATCH_INTERVAL segundos.
+VERIFICATION_EMAIL_BATCHING = os.getenv("VERIFICATION_EMAIL_BATCHING", "0") == "1"
+VERIFICATION_EMAIL_BATCH_SIZE = int(os.getenv("VERIFICATION_EMAIL_BATCH_SIZE", "100"))
+VERIFICATION_EMAIL_BATCH_INTERVAL = int(os.getenv("VERIFICATION_EMAIL_BATCH_INTERVAL", "10"))
+# Segundos tras los que un lote tomado y sin enviar (worker caído) vuelve a la cola
+VERIFICATION_EMAIL_CLAIM_TIMEOUT = int(os.getenv("VERIFICATION_EMAIL_CLAIM_TIMEOUT", "300"))
+
+# Outbox: las tareas se publican al broker desde la tabla OutboxMessage
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "200"))
+OUTBOX_RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", "2"))
+# Un mensaje que no se puede publicar se reintenta con backoff exponencial
+# (OUTBOX_RETRY_BACKOFF * 2^intento, hasta OUTBOX_RETRY_BACKOFF_MAX segundos);
+# tras OUTBOX_MAX_ATTEMPTS queda como fallido para no bloquear la cola.
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "15"))
+OUTBOX_RETRY_BACKOFF = int(os.getenv("OUTBOX_RETRY_BACKOFF", "2"))
+OUTBOX_RETRY_BACKOFF_MAX = int(os.getenv("OUTBOX_RETRY_BACKOFF_MAX", "3600"))
+
+# Limpieza periódica: tokens vencidos/usados y outbox publicado se conservan
+# TOKEN_RETENTION_HOURS; los concursantes sin verificar se borran tras
+# UNVERIFIED_CONTESTANT_MAX_AGE_DAYS (0 = nunca).
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+TOKEN_RETENTION = timedelta(hours=int(os.getenv("TOKEN_RETENTION_HOURS", "24")))
+UNVERIFIED_CONTESTANT_MAX_AGE = (
+    timedelta(days=int(os.getenv("UNVERIFIED_CONTESTANT_MAX_AGE_DAYS", "0"))) or None
+)
+
+CELERY_BEAT_SCHEDULE = {
+    "relay-outbox": {
+        "task": "contest.tasks.relay_outbox_messages",
+        "schedule": OUTBOX_RELAY_INTERVAL,
+    },
+    "purge-stale-records": {
+        "task": "contest.tasks.purge_stale_records",
+        "schedule": timedelta(hours=1),
+    },
+    "reconcile-dashboard-stats": {
+        "task": "contest.tasks.reconcile_dashboard_stats",
+        "schedule": timedelta(minutes=10),
+    },
+}
+if VERIFICATION_EMAIL_BATCHING:
+    CELERY_BEAT_SCHEDULE["send-pending-verification-emails"] = {
+        "task": "contest.tasks.send_pending_verification_emails",
+        "schedule": VERIFICATION_EMAIL_BATCH_INTERVAL,
+    }
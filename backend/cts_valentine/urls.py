@@ -18,6 +18,8 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from contest.views import metrics_view
+
 urlpatterns = [
     # Panel de administración de Django
     path("admin/", admin.site.urls),
@@ -28,4 +30,7 @@ urlpatterns = [
 
     # App contest
     path("api/", include("contest.urls", namespace="contest")),
+
+    # Métricas para Prometheus
+    path("metrics", metrics_view, name="metrics"),
 ]